@@ -1,13 +1,20 @@
 """
-FastAPI Application: 3 endpoints
-/upload, /ask, /extract
+FastAPI Application: core endpoints
+/upload (+ /jobs/{job_id}), /ask, /extract
 """
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
-import shutil
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+import asyncio
+import hashlib
+import json
+import time
+import uuid
 
 # SET WORKING DIRECTORY FIRST
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
@@ -16,21 +23,47 @@ print(f"📂 Working directory: {os.getcwd()}")
 # CREATE DATA DIRECTORIES
 os.makedirs("data/uploads", exist_ok=True)
 os.makedirs("data/chroma_db", exist_ok=True)
+os.makedirs("data/parse_cache", exist_ok=True)
+os.makedirs("data/extraction_cache", exist_ok=True)
 print("✅ Data directories created")
 
+from src.answer_cache import AnswerCache
+from src.cache import DiskCache
 from src.document_processor import DocumentProcessor
+from src.parsers import make_parser
+from src.embeddings import LocalEmbeddingFunction, CachedEmbeddingFunction, EmbeddingCache
+from src.lexical_index import BM25Index
 from src.vector_store import VectorStore
 from src.rag_engine import RAGEngine
 from src.extractor import StructuredExtractor
+from src.job_queue import JobStore, IngestionQueue
+from src.shard_router import ShardRouter
+from src.metrics import REGISTRY
+from src.single_flight import SingleFlight
+from src.prompt_budget import PromptBudget
+from src.llm_client import OpenAIClientFactory
+from src.guardrails import Calibration
+from src.retrieval_gate import RetrievalGate
+from src.load_records import LoadRecords, RecordRefresher
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the ingestion workers for the lifetime of the app"""
+    await ingestion_queue.start()
+    yield
+    await ingestion_queue.stop()
+    await record_refresher.stop()
+    await llm_clients.aclose()
+
 # Initialize FastAPI
 app = FastAPI(
     title="Ultra Doc Intelligence",
     description="RAG system for logistics documents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS
@@ -42,16 +75,225 @@ app.add_middleware(
 )
 
 # Initialize components
-processor = DocumentProcessor(api_key=os.getenv("LLAMA_CLOUD_API_KEY"))
-vector_store = VectorStore()
+parse_cache = DiskCache(
+    "./data/parse_cache",
+    max_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "256")) * 1024 * 1024
+)
+processor = DocumentProcessor(
+    api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+    cache=parse_cache,
+    max_chunk_tokens=int(os.getenv("CHUNK_MAX_TOKENS", "400")),
+    chunk_overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "40")),
+    parser=make_parser(
+        os.getenv("PDF_PARSER", "auto"),
+        api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+        workers=int(os.getenv("PDF_PARSER_WORKERS", "0")) or None,
+        min_chars_per_page=float(os.getenv("PDF_MIN_CHARS_PER_PAGE", "200"))
+    )
+)
+embedding_function = LocalEmbeddingFunction(
+    batch_size=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+    num_threads=int(os.getenv("EMBED_THREADS", "0")) or None
+)
+embedding_cache = None
+if os.getenv("EMBED_CACHE", "1") == "1":
+    embedding_cache = EmbeddingCache("./data/embedding_cache.db")
+    embedding_function = CachedEmbeddingFunction(
+        embedding_function,
+        embedding_cache,
+        model_name=LocalEmbeddingFunction.MODEL_NAME
+    )
+vector_store = VectorStore(
+    max_workers=int(os.getenv("CHROMA_WORKERS", "4")),
+    embedding_function=embedding_function,
+    lexical_index=BM25Index("./data/bm25_index.db"),
+    router=ShardRouter(strategy=os.getenv("SHARD_STRATEGY", "none")),
+    fanout_workers=int(os.getenv("SHARD_FANOUT_WORKERS", "8"))
+)
+answer_cache = AnswerCache(
+    similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95")),
+    ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+)
+# Latest extraction per load (filled by /extract, or at ingest with
+# PRECOMPUTE_EXTRACTION=1); serves /extract and single-field questions
+load_records = LoadRecords(os.getenv("LOAD_RECORDS_DB", "./data/load_records.db"))
+# One pooled transport + in-flight limit for every OpenAI call
+llm_clients = OpenAIClientFactory(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    base_url=os.getenv("OPENAI_BASE_URL") or None,
+    max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+    http2=os.getenv("OPENAI_HTTP2", "1") == "1",
+    connect_timeout=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")),
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+    max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "32"))
+)
 rag_engine = RAGEngine(
     api_key=os.getenv("OPENAI_API_KEY"),
-    vector_store=vector_store
+    vector_store=vector_store,
+    answer_cache=answer_cache,
+    retrieval_mode=os.getenv("RETRIEVAL_MODE", "hybrid"),
+    n_candidates=int(os.getenv("RETRIEVAL_CANDIDATES", "10")),
+    prompt_budget=PromptBudget(
+        max_tokens=int(os.getenv("ANSWER_PROMPT_MAX_TOKENS", "2000")), name="answer"
+    ) if os.getenv("ANSWER_PROMPT_MAX_TOKENS", "2000") != "0" else None,
+    client=llm_clients.client(timeout=float(os.getenv("ASK_TIMEOUT", "30")), name="ask"),
+    # Fitted offline with `python calibrate.py fit eval.jsonl`
+    calibration=Calibration.load(os.getenv("CONFIDENCE_CALIBRATION"))
+    if os.getenv("CONFIDENCE_CALIBRATION") else None,
+    gate=RetrievalGate(
+        max_distance=float(os.getenv("GATE_MAX_DISTANCE", "0.85")),
+        max_mean_distance=float(os.getenv("GATE_MAX_MEAN_DISTANCE", "1.2")),
+        min_coverage=float(os.getenv("GATE_MIN_COVERAGE", "0.5")),
+        extractive_coverage=float(os.getenv("GATE_EXTRACTIVE_COVERAGE", "0.25")),
+        extractive=os.getenv("GATE_EXTRACTIVE", "1") == "1"
+    ) if os.getenv("RETRIEVAL_GATE", "1") == "1" else None,
+    load_records=load_records if os.getenv("FIELD_ANSWERS", "1") == "1" else None
+)
+extraction_cache = DiskCache(
+    "./data/extraction_cache",
+    max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_MB", "64")) * 1024 * 1024
+)
+extractor = StructuredExtractor(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    max_concurrency=int(os.getenv("EXTRACT_CONCURRENCY", "4")),
+    timeout=float(os.getenv("EXTRACT_TIMEOUT", "60")),
+    cache=extraction_cache,
+    # GPT-4 has an 8k window shared with the JSON answer
+    prompt_budget=PromptBudget(
+        max_tokens=int(os.getenv("EXTRACT_PROMPT_MAX_TOKENS", "6000")), name="extract"
+    ) if os.getenv("EXTRACT_PROMPT_MAX_TOKENS", "6000") != "0" else None,
+    client=llm_clients.client(timeout=float(os.getenv("EXTRACT_TIMEOUT", "60")), name="extract")
 )
-extractor = StructuredExtractor(api_key=os.getenv("OPENAI_API_KEY"))
 
 print("✅ All components initialized successfully")
 
+def _save_upload(file: UploadFile, file_path: str) -> str:
+    """Blocking copy of the upload to disk (run in a thread); returns SHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        for block in iter(lambda: file.file.read(1 << 20), b""):
+            digest.update(block)
+            buffer.write(block)
+    return digest.hexdigest()
+
+async def _ingest(job: Dict, stage) -> Dict:
+    """Job pipeline: parse → chunk → embed + store"""
+    file_path = job['file_path']
+    
+    async with stage("parse"):
+        print(f"🔄 Processing with {processor.parser.name}: {file_path}")
+        chunks = await processor.process_pdf(file_path)
+        print(f"✅ Created {len(chunks)} chunks")
+    
+    tenant_id = job['options'].get('tenant_id')
+    if tenant_id:
+        chunks = [{**c, 'metadata': {**c['metadata'], 'tenant_id': tenant_id}} for c in chunks]
+    
+    async with stage("store"):
+        num_chunks = await vector_store.aadd_chunks(
+            chunks, replace=job['options'].get('replace', False)
+        )
+    
+    # Extract metadata
+    reference_id = chunks[0]['metadata'].get('reference_id') if chunks else None
+    doc_type = chunks[0]['metadata'].get('doc_type') if chunks else None
+    
+    # Records extracted before these chunks are stale from here on
+    load_records.invalidate(c['metadata'].get('reference_id') for c in chunks)
+    if PRECOMPUTE_EXTRACTION and reference_id:
+        record_refresher.schedule(reference_id, tenant_id)
+    
+    print(f"✅ Upload complete: {num_chunks} chunks, ref_id: {reference_id}")
+    
+    return {
+        "chunks": num_chunks,
+        "reference_id": reference_id,
+        "doc_type": doc_type,
+        "extraction": "scheduled" if PRECOMPUTE_EXTRACTION and reference_id else None
+    }
+
+job_store = JobStore("./data/jobs.db")
+ingestion_queue = IngestionQueue(
+    job_store,
+    handler=_ingest,
+    workers=int(os.getenv("INGEST_WORKERS", "2"))
+)
+
+# Metrics read at scrape time
+def _cache_stats() -> Dict[str, Dict]:
+    caches = {
+        "parse": parse_cache,
+        "answer": answer_cache,
+        "extraction": extraction_cache,
+        "embedding": embedding_cache
+    }
+    return {name: cache.stats() for name, cache in caches.items() if cache is not None}
+
+REGISTRY.collector(
+    "udi_cache_hit_ratio", "Cache hit rate since start",
+    lambda: {(name, ): stats['hit_rate'] for name, stats in _cache_stats().items()},
+    label_names=("cache",)
+)
+REGISTRY.collector(
+    "udi_cache_lookups_total", "Cache lookups by result",
+    lambda: {
+        (name, result): stats[f"{result}s"]
+        for name, stats in _cache_stats().items() for result in ("hit", "miss")
+    },
+    label_names=("cache", "result"),
+    kind="counter"
+)
+REGISTRY.collector(
+    "udi_chroma_chunks", "Chunks stored per Chroma collection (shard)",
+    lambda: {(name, ): count for name, count in vector_store.shard_counts().items()},
+    label_names=("shard",)
+)
+REGISTRY.collector(
+    "udi_bm25_documents", "Chunks in the BM25 index",
+    lambda: {(): len(vector_store.lexical_index)}
+)
+REGISTRY.collector(
+    "udi_llm_calls_in_flight", "OpenAI calls holding (in_flight) or waiting for (waiting) a slot",
+    lambda: {(state, ): llm_clients.stats()[state] for state in ("in_flight", "waiting")},
+    label_names=("state",)
+)
+REGISTRY.collector(
+    "udi_ingest_queue_depth", "Ingestion jobs waiting for a worker",
+    lambda: {(): ingestion_queue.depth()}
+)
+REGISTRY.collector(
+    "udi_extraction_refresh_pending", "Loads waiting for a background extraction",
+    lambda: {(): record_refresher.pending()}
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "udi_http_request_seconds", "Request latency by route",
+    ("method", "route", "status")
+)
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Per-route latency (streaming responses: time to first byte)"""
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    HTTP_SECONDS.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics: stage latency, LLM tokens, cache hit rates, collection size"""
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 @app.get("/")
 @app.head("/")
 def root():
@@ -59,12 +301,22 @@ def root():
     return {
         "status": "ok",
         "message": "Ultra Doc Intelligence API is running",
-        "endpoints": ["/upload", "/ask", "/extract"]
+        "endpoints": ["/upload", "/jobs/{job_id}", "/ask", "/ask/stream", "/extract", "/extract/batch", "/metrics"]
     }
 
-@app.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
-    """Upload and process PDF document"""
+@app.post("/upload", status_code=202)
+async def upload_document(
+    file: UploadFile = File(...),
+    replace: bool = Form(False),
+    tenant_id: str = Form(None)
+):
+    """
+    Accept PDF and queue it for background ingestion
+    replace: Drop chunks previously stored for this reference_id + doc_type
+    tenant_id: Customer the document belongs to (SHARD_STRATEGY=tenant)
+    
+    Returns a job id immediately; poll /jobs/{job_id} for progress
+    """
     try:
         print(f"\n📤 Received upload request: {file.filename}")
         
@@ -72,40 +324,33 @@ async def upload_document(file: UploadFile = File(...)):
         if not file.filename.endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # Save file
-        file_path = f"./data/uploads/{file.filename}"
+        # Save file (unique name so concurrent uploads never collide)
+        file_path = f"./data/uploads/{uuid.uuid4().hex[:8]}_{os.path.basename(file.filename)}"
         print(f"💾 Saving to: {file_path}")
-        print(f"📂 Current directory: {os.getcwd()}")
-        print(f"📁 Upload dir exists: {os.path.exists('./data/uploads')}")
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
         
-        print(f"✅ File saved: {os.path.exists(file_path)}")
+        file_hash = await asyncio.to_thread(_save_upload, file, file_path)
         print(f"📏 File size: {os.path.getsize(file_path)} bytes")
         
-        # Process document
-        print(f"🔄 Processing with LlamaParse...")
-        chunks = processor.process_pdf(file_path)
-        print(f"✅ Created {len(chunks)} chunks")
-        
-        # Store in vector database
-        num_chunks = vector_store.add_chunks(chunks)
-        
-        # Extract metadata
-        reference_id = chunks[0]['metadata'].get('reference_id') if chunks else None
-        doc_type = chunks[0]['metadata'].get('doc_type') if chunks else None
+        job = ingestion_queue.submit(
+            filename=file.filename,
+            file_path=file_path,
+            file_hash=file_hash,
+            options={"replace": replace, "tenant_id": tenant_id}
+        )
+        if job['file_path'] != file_path:
+            os.remove(file_path)  # Duplicate of an in-flight job
         
-        print(f"✅ Upload complete: {num_chunks} chunks, ref_id: {reference_id}")
+        print(f"📥 Queued job {job['id']} (queue depth: {ingestion_queue.depth()})")
         
         return {
-            "status": "success",
-            "message": f"Processed {file.filename}",
-            "chunks": num_chunks,
-            "reference_id": reference_id,
-            "doc_type": doc_type
+            "status": job['status'],
+            "message": f"Queued {file.filename}",
+            "job_id": job['id'],
+            "status_url": f"/jobs/{job['id']}"
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"\n❌ ERROR in upload:")
         print(f"   Error type: {type(e).__name__}")
@@ -115,49 +360,200 @@ async def upload_document(file: UploadFile = File(...)):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Ingestion job status: stage, per-stage timings and result"""
+    job = job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return {
+        "job_id": job['id'],
+        "filename": job['filename'],
+        "status": job['status'],
+        "stage": job['stage'],
+        "stages": job['stages'],
+        "result": job['result'],
+        "error": job['error'],
+        "created_at": job['created_at'],
+        "updated_at": job['updated_at']
+    }
+
 @app.post("/ask")
 async def ask_question(
     question: str = Form(...),
-    reference_id: str = Form(None)
+    reference_id: str = Form(None),
+    tenant_id: str = Form(None)
 ):
     """Ask question about uploaded documents"""
     try:
         if not question or len(question.strip()) == 0:
             raise HTTPException(status_code=400, detail="Question cannot be empty")
         
-        result = rag_engine.ask(question, reference_id)
+        result = await rag_engine.ask(question, reference_id, tenant_id)
         return result
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
 
+async def _fetch_load_chunks(reference_id: str, tenant_id: str = None) -> List[Dict]:
+    """All stored chunks for one load (metadata lookup, no similarity search)"""
+    return await vector_store.aget_by_reference_id(reference_id, tenant_id=tenant_id)
+
+# Concurrent /extract calls for one load share a single fetch + extraction
+load_extractions = SingleFlight("extract_load")
+
+async def _extract_load(reference_id: str, tenant_id: str = None) -> Optional[Dict]:
+    """Extracted fields for one load, or None if it has no documents"""
+    record = load_records.get(reference_id, tenant_id)
+    if record is not None:
+        return record['merged']
+    
+    async def run() -> Optional[Dict]:
+        # Generation seen BEFORE the fetch: a concurrent upload makes the record stale
+        generation = load_records.generation(reference_id)
+        results = await _fetch_load_chunks(reference_id, tenant_id)
+        if not results:
+            return None
+        # Per-doc-type results are cached by content: only changed doc types hit GPT-4
+        record = await extractor.extract_record(results)
+        load_records.put(reference_id, record, generation, tenant_id)
+        return record['merged']
+    
+    return await load_extractions.do((reference_id, tenant_id), run)
+
+async def _refresh_record(reference_id: str, tenant_id: str = None) -> bool:
+    """Background extraction after ingest; False if the load changed meanwhile"""
+    merged = await _extract_load(reference_id, tenant_id)
+    return merged is None or load_records.get(reference_id, tenant_id) is not None
+
+def _upstream_status(error: Exception) -> Optional[int]:
+    """504 for GPT-4 timeouts, 503 when OpenAI is unavailable / rate limited, else None"""
+    if isinstance(error, (asyncio.TimeoutError, APITimeoutError)):
+        return 504
+    if isinstance(error, (APIConnectionError, RateLimitError, InternalServerError)):
+        return 503
+    return None
+
+PRECOMPUTE_EXTRACTION = os.getenv("PRECOMPUTE_EXTRACTION", "0") == "1"
+record_refresher = RecordRefresher(
+    _refresh_record,
+    delay=float(os.getenv("PRECOMPUTE_DELAY", "2"))
+)
+
+@app.post("/ask/stream")
+async def ask_question_stream(
+    question: str = Form(...),
+    reference_id: str = Form(None),
+    tenant_id: str = Form(None)
+):
+    """
+    Ask with server-sent events
+    Events: sources → token (repeated) → done (answer, confidence, sources)
+    """
+    if not question or len(question.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    
+    async def events():
+        try:
+            async for event in rag_engine.ask_stream(question, reference_id, tenant_id):
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception as e:
+            error = {"detail": f"Error answering question: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/extract")
-async def extract_data(reference_id: str = Form(...)):
+async def extract_data(
+    reference_id: str = Form(...),
+    tenant_id: str = Form(None)
+):
     """Extract structured data from documents"""
     try:
         if not reference_id:
             raise HTTPException(status_code=400, detail="reference_id is required")
         
-        results = vector_store.query(
-            query_text=reference_id,
-            n_results=20,
-            filter_dict={"reference_id": reference_id}
-        )
+        extracted = await _extract_load(reference_id, tenant_id)
         
-        if not results:
+        if extracted is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"No documents found for reference_id: {reference_id}"
             )
         
-        extracted = extractor.extract(results)
         return extracted
     
     except HTTPException:
         raise
     except Exception as e:
+        status = _upstream_status(e)
+        if status is not None:
+            raise HTTPException(
+                status_code=status,
+                detail=f"Extraction model unavailable ({type(e).__name__}), retry later"
+            )
         raise HTTPException(status_code=500, detail=f"Error extracting data: {str(e)}")
 
+@app.post("/extract/batch")
+async def extract_batch(
+    reference_ids: List[str] = Form(...),
+    tenant_id: str = Form(None)
+):
+    """
+    Extract many loads; streams one NDJSON line per load as it completes
+    Each line: {"reference_id", "status", "data" | "error" + "code"}
+    status "unavailable" (code 503/504): GPT-4 timed out or is down, retry later
+    """
+    reference_ids = list(dict.fromkeys(r for r in reference_ids if r))
+    if not reference_ids:
+        raise HTTPException(status_code=400, detail="reference_ids is required")
+    
+    # Bound loads in flight; GPT-4 calls are further bounded by the extractor
+    limit = asyncio.Semaphore(int(os.getenv("BATCH_EXTRACT_LOADS", "8")))
+    
+    async def extract_one(reference_id: str) -> Dict:
+        async with limit:
+            try:
+                data = await _extract_load(reference_id, tenant_id)
+                if data is None:
+                    return {"reference_id": reference_id, "status": "not_found"}
+                return {"reference_id": reference_id, "status": "success", "data": data}
+            except Exception as e:
+                status = _upstream_status(e)
+                return {
+                    "reference_id": reference_id,
+                    "status": "error" if status is None else "unavailable",
+                    "code": status or 500,
+                    "error": str(e) or type(e).__name__
+                }
+    
+    async def stream():
+        tasks = [asyncio.create_task(extract_one(r)) for r in reference_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()  # Client disconnected - stop remaining work
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss metrics for the parse, answer, extraction and embedding caches"""
+    return _cache_stats()
+
+@app.delete("/cache/parse")
+def clear_parse_cache():
+    """Invalidate all cached LlamaParse results"""
+    removed = parse_cache.clear()
+    return {"status": "success", "removed": removed, "stats": parse_cache.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     
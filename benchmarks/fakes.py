@@ -0,0 +1,125 @@
+"""
+Fakes: Deterministic local stand-ins for LlamaParse, OpenAI and the embedding model
+Latencies are configurable so remote round-trips can be simulated
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+from types import SimpleNamespace
+from typing import Dict, List
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from benchmarks.synthetic import make_document
+from src.utils import count_tokens
+
+
+class FakeParser:
+    """Parser backend: "<load>-<doc_type>.pdf" → synthetic markdown (no file needed)"""
+    name = "fake"
+
+    def __init__(self, latency: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.seed = seed
+
+    def settings(self) -> Dict:
+        return {'parser': self.name, 'seed': self.seed}
+
+    async def aparse(self, file_path: str) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        load, doc_type = os.path.splitext(os.path.basename(file_path))[0].split("-", 1)
+        return make_document(int(load), doc_type, self.seed)
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Feature-hashed bag of words, L2-normalized (fast, no model download)"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = np.zeros((len(input), self.dim), dtype=np.float32)
+        for row, text in enumerate(input):
+            for token in re.findall(r"[a-z0-9$.,]+", text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                vectors[row, int.from_bytes(digest, "little") % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return list(vectors / np.where(norms == 0, 1.0, norms))
+
+
+def _usage(prompt: str, completion: str) -> SimpleNamespace:
+    prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(completion)
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens
+    )
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self.owner = owner
+
+    async def create(self, model: str, messages: List[Dict], stream: bool = False, **kwargs):
+        self.owner.calls += 1
+        if self.owner.latency:
+            await asyncio.sleep(self.owner.latency)
+
+        prompt = messages[-1]['content']
+        content = self.owner.respond(prompt)
+        if not stream:
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=_usage(prompt, content)
+            )
+        return self._stream(prompt, content)
+
+    async def _stream(self, prompt: str, content: str):
+        for word in re.findall(r"\S+\s*", content):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))], usage=None)
+        yield SimpleNamespace(choices=[], usage=_usage(prompt, content))
+
+
+class FakeOpenAI:
+    """
+    AsyncOpenAI stand-in: chat.completions.create (incl. stream=True)
+    Extraction prompts get JSON read off the document; questions get a
+    short answer citing the first amount in the context
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+
+    @staticmethod
+    def respond(prompt: str) -> str:
+        if "Return JSON" in prompt:
+            def find(pattern):
+                match = re.search(pattern, prompt)
+                return match.group(1) if match else None
+
+            total = find(r"\*\*Total\*\* \| \| \*\*\$([\d,]+\.\d\d)")
+            weight = find(r"([\d,]+) lbs") or find(r"\| ([\d,]+) \| \d+ \|")
+            return json.dumps({
+                "shipment_id": find(r"Reference ID \| (\w+)"),
+                "shipper": find(r"## Shipper\n(.+)"),
+                "consignee": find(r"## Consignee\n(.+)"),
+                "pickup_datetime": find(r"(?:Pickup|Ship) Date \| ([\d/]+)"),
+                "delivery_datetime": None,
+                "equipment_type": find(r"Equipment \| (.+?) \|"),
+                "mode": "FTL",
+                "rate": float(total.replace(",", "")) if total else None,
+                "currency": "USD" if total else None,
+                "weight": float(weight.replace(",", "")) if weight else None,
+                "carrier_name": find(r"## Carrier Details\n(.+)")
+            })
+
+        amount = re.search(r"\$[\d,]+(?:\.\d\d)?", prompt)
+        if amount:
+            return f"The amount is {amount.group(0)} [Source 1]."
+        return "Not found in the provided sources."
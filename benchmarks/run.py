@@ -0,0 +1,260 @@
+"""
+Pipeline Benchmark: ingest throughput, ask / extract latency vs collection size
+Everything remote is faked (see benchmarks/fakes.py), so it runs offline
+
+    python -m benchmarks.run                                  # quick run
+    python -m benchmarks.run --loads 2000,20000 --llm-latency 0.4 --output bench.json
+
+Each step grows the collection to the given number of loads (3 documents
+each) and then measures RAGEngine.ask and the /extract path at that size.
+Components are wired with app.py's defaults (answer cache, prompt budgets,
+retrieval gate, field answers, extraction cache + load records); --no-*
+flags switch them off one at a time. Results are JSON so releases can be
+compared.
+"""
+from contextlib import redirect_stdout
+from typing import Awaitable, Callable, Dict, List
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.fakes import FakeOpenAI, FakeParser, HashEmbeddingFunction
+from benchmarks.synthetic import document_names, reference_id
+from src.answer_cache import AnswerCache
+from src.cache import DiskCache
+from src.document_processor import DocumentProcessor
+from src.extractor import StructuredExtractor
+from src.lexical_index import BM25Index
+from src.load_records import LoadRecords
+from src.metrics import STAGE_SECONDS
+from src.prompt_budget import PromptBudget
+from src.rag_engine import RAGEngine
+from src.retrieval_gate import RetrievalGate
+from src.shard_router import ShardRouter
+from src.vector_store import VectorStore
+
+QUESTIONS = [
+    "What is the carrier rate?",
+    "What is the customer rate?",
+    "Who is the carrier?",
+    "When is the pickup scheduled?",
+    "What is the delivery address?",
+    "What commodity is being shipped?",
+    "What is the weight?",
+]
+
+
+def latency_summary(samples: List[float], elapsed: float) -> Dict:
+    """Percentiles in milliseconds + throughput"""
+    if not samples:
+        return {'requests': 0}
+    ms = np.asarray(samples) * 1000
+    return {
+        'requests': len(samples),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p95_ms': round(float(np.percentile(ms, 95)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'mean_ms': round(float(ms.mean()), 2),
+        'max_ms': round(float(ms.max()), 2),
+        'per_second': round(len(samples) / elapsed, 2) if elapsed else 0.0
+    }
+
+
+async def run_load(requests: List, handler: Callable[..., Awaitable], concurrency: int) -> Dict:
+    """Run handler over requests with `concurrency` workers; latency per request"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            request = queue.get_nowait()
+            start = time.perf_counter()
+            await handler(*request)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latency_summary(samples, time.perf_counter() - start)
+
+
+async def ingest(processor: DocumentProcessor, vector_store: VectorStore,
+                 names: List[str], concurrency: int, batch_size: int) -> Dict:
+    """Parse + chunk (concurrently) then embed + store in large batches"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(name: str) -> List[Dict]:
+        async with semaphore:
+            return await processor.process_pdf(name)
+
+    documents = chunks = 0
+    start = time.perf_counter()
+    for i in range(0, len(names), batch_size):
+        batch = await asyncio.gather(*[process(name) for name in names[i:i + batch_size]])
+        flat = [chunk for doc_chunks in batch for chunk in doc_chunks]
+        chunks += await vector_store.aadd_chunks(flat)
+        documents += len(batch)
+    elapsed = time.perf_counter() - start
+    return {
+        'documents': documents,
+        'chunks': chunks,
+        'seconds': round(elapsed, 3),
+        'docs_per_second': round(documents / elapsed, 2) if elapsed else 0.0,
+        'chunks_per_second': round(chunks / elapsed, 2) if elapsed else 0.0
+    }
+
+
+def stage_summary() -> Dict:
+    """Mean milliseconds per pipeline stage (from the metrics spans)"""
+    return {
+        key[0]: {
+            'count': series['count'],
+            'mean_ms': round(series['sum'] / series['count'] * 1000, 3) if series['count'] else 0.0
+        }
+        for key, series in sorted(STAGE_SECONDS.snapshot().items())
+    }
+
+
+async def benchmark(args) -> Dict:
+    rng = random.Random(args.seed)
+    workdir = args.persist_dir or tempfile.mkdtemp(prefix="udi-bench-")
+
+    llm = FakeOpenAI(latency=args.llm_latency)
+    processor = DocumentProcessor(
+        api_key=None,
+        max_chunk_tokens=args.chunk_tokens,
+        parser=FakeParser(latency=args.parse_latency, seed=args.seed)
+    )
+    vector_store = VectorStore(
+        persist_directory=os.path.join(workdir, "chroma_db"),
+        embedding_function=HashEmbeddingFunction(),
+        lexical_index=BM25Index(os.path.join(workdir, "bm25_index.db")),
+        router=ShardRouter(strategy=args.shard_strategy)
+    )
+    # Same components and defaults as app.py
+    load_records = LoadRecords(os.path.join(workdir, "load_records.db"))
+    rag_engine = RAGEngine(
+        api_key="benchmark",
+        vector_store=vector_store,
+        answer_cache=AnswerCache() if args.answer_cache else None,
+        retrieval_mode=args.retrieval_mode,
+        n_candidates=10,
+        prompt_budget=PromptBudget(max_tokens=2000, name="answer") if args.prompt_budget else None,
+        client=llm,
+        gate=RetrievalGate() if args.gate else None,
+        load_records=load_records if args.field_answers else None
+    )
+    extractor = StructuredExtractor(
+        api_key="benchmark",
+        max_concurrency=args.concurrency,
+        cache=DiskCache(os.path.join(workdir, "extraction_cache")) if args.extraction_cache else None,
+        prompt_budget=PromptBudget(max_tokens=6000, name="extract") if args.prompt_budget else None,
+        client=llm
+    )
+
+    async def ask(question: str, ref: str):
+        await rag_engine.ask(question, ref)
+
+    async def extract(ref: str):
+        """app._extract_load: current record, else fetch + extract + store"""
+        if load_records.get(ref) is not None:
+            return
+        generation = load_records.generation(ref)
+        chunks = await vector_store.aget_by_reference_id(ref)
+        load_records.put(ref, await extractor.extract_record(chunks), generation)
+
+    steps = []
+    loaded = 0
+    try:
+        for target in args.loads:
+            names = document_names(target - loaded, start=loaded)
+            print(f"⏱️ Ingesting loads {loaded}-{target}...", file=sys.stderr)
+            with redirect_stdout(io.StringIO()):
+                ingest_stats = await ingest(
+                    processor, vector_store, names, args.concurrency, args.batch_size
+                )
+            load_records.invalidate(reference_id(i) for i in range(loaded, target))
+            loaded = target
+
+            asks = [(rng.choice(QUESTIONS), reference_id(rng.randrange(loaded)))
+                    for _ in range(args.queries)]
+            extracts = [(reference_id(rng.randrange(loaded)), ) for _ in range(args.extracts)]
+
+            print(f"⏱️ Measuring at {loaded} loads...", file=sys.stderr)
+            with redirect_stdout(io.StringIO()):
+                ask_stats = await run_load(asks, ask, args.concurrency)
+                extract_stats = await run_load(extracts, extract, args.concurrency)
+
+            steps.append({
+                'loads': loaded,
+                'chunks': vector_store.count(),
+                'ingest': ingest_stats,
+                'ask': ask_stats,
+                'extract': extract_stats
+            })
+    finally:
+        if args.persist_dir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'steps': steps,
+        'stages': stage_summary(),
+        'llm_calls': llm.calls
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--loads", default="200,1000",
+                        help="Comma-separated collection sizes in loads (3 documents each)")
+    parser.add_argument("--queries", type=int, default=200, help="Asks per step")
+    parser.add_argument("--extracts", type=int, default=50, help="Extractions per step")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=300, help="Documents per store call")
+    parser.add_argument("--chunk-tokens", type=int, default=400)
+    parser.add_argument("--parse-latency", type=float, default=0.0, help="Seconds per fake parse")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per fake LLM call")
+    parser.add_argument("--retrieval-mode", default="hybrid", choices=["hybrid", "vector"])
+    parser.add_argument("--shard-strategy", default="none", choices=["none", "tenant", "month"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--persist-dir", default=None, help="Keep the collection here (default: temp)")
+    for component, what in (("answer-cache", "semantic answer cache"),
+                             ("prompt-budget", "answer / extraction prompt budgets"),
+                             ("gate", "pre-LLM retrieval gate"),
+                             ("field-answers", "single-field answers from load records"),
+                             ("extraction-cache", "per-doc-type extraction cache")):
+        parser.add_argument(f"--no-{component}", dest=component.replace("-", "_"),
+                            action="store_false", help=f"Disable the {what}")
+    parser.add_argument("--output", default=None, help="Write JSON here (default: stdout)")
+    args = parser.parse_args()
+    args.loads = sorted(int(n) for n in args.loads.split(","))
+
+    results = asyncio.run(benchmark(args))
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"✅ Wrote {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
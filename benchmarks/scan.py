@@ -0,0 +1,129 @@
+"""
+Metadata Scan Micro-benchmark: scan_document vs the per-field functions
+Runs on synthetic markdown padded with terms-and-conditions text, the way
+real rate confirmations carry pages of boilerplate
+
+    python -m benchmarks.scan
+    python -m benchmarks.scan --documents 3000 --pad-kb 40 --output scan.json
+
+Checks both paths agree on every document before timing them.
+"""
+from typing import Callable, Dict, List
+import argparse
+import json
+import platform
+import random
+import re
+import sys
+import time
+
+from benchmarks.synthetic import DOC_TYPES, make_document
+from src.utils import (
+    detect_doc_type, extract_pickup_date, extract_reference_id, identify_section, scan_document
+)
+
+BOILERPLATE = [
+    "Carrier agrees that all freight will be tendered in good order and condition.",
+    "Payment terms are net 30 days from receipt of signed proof of delivery and invoice.",
+    "Detention is billed after 2 free hours with supporting in/out times on the BOL.",
+    "Double brokering is strictly prohibited and will result in non-payment.",
+    "The shipper's load and count applies unless otherwise noted on the receipt.",
+    "Claims must be filed in writing within 9 months of the delivery date.",
+]
+
+
+def padded_document(load: int, doc_type: str, pad_kb: int, seed: int, labelled: bool = True) -> str:
+    """
+    Synthetic document + a terms section of about pad_kb kilobytes
+    labelled=False drops the "Reference ID" label (id only as a bare LD number),
+    the slow path for the per-field functions
+    """
+    rng = random.Random(f"{seed}:{load}:{doc_type}:pad")
+    lines, size = [], 0
+    while size < pad_kb * 1024:
+        line = rng.choice(BOILERPLATE)
+        lines.append(line)
+        size += len(line) + 1
+    document = make_document(load, doc_type, seed)
+    if not labelled:
+        document = document.replace("| Reference ID |", "| Load # |")
+    return document + "\n## Terms and Conditions\n" + "\n".join(lines) + "\n"
+
+
+def per_field(text: str) -> Dict:
+    """The previous path: one scan per field + one per section"""
+    sections = re.split(r'\n(?=##\s)', text)
+    return {
+        'reference_id': extract_reference_id(text),
+        'doc_type': detect_doc_type(text),
+        'pickup_date': extract_pickup_date(text),
+        'section_types': [identify_section(s) for s in sections[1:]]
+    }
+
+
+def single_pass(text: str) -> Dict:
+    result = scan_document(text)
+    return {**result, 'section_types': result['section_types'][1:]}
+
+
+def timed(fn: Callable[[str], Dict], documents: List[str], repeat: int) -> Dict:
+    """Best of `repeat` runs over all documents"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in documents:
+            fn(text)
+        runs.append(time.perf_counter() - start)
+    best = min(runs)
+    return {
+        'seconds': round(best, 4),
+        'us_per_document': round(best / len(documents) * 1e6, 2),
+        'mb_per_second': round(sum(len(d) for d in documents) / best / 1e6, 2)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="scan_document micro-benchmark")
+    parser.add_argument("--documents", type=int, default=1500)
+    parser.add_argument("--pad-kb", type=int, default=20, help="Boilerplate per document")
+    parser.add_argument("--unlabelled", type=float, default=0.2,
+                        help="Fraction of documents without a Reference ID label")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write JSON here (default: stdout)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [
+        padded_document(i // len(DOC_TYPES), DOC_TYPES[i % len(DOC_TYPES)], args.pad_kb, args.seed,
+                        labelled=rng.random() >= args.unlabelled)
+        for i in range(args.documents)
+    ]
+    mismatches = sum(per_field(d) != single_pass(d) for d in documents)
+    if mismatches:
+        print(f"❌ {mismatches} documents differ between the two paths", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"⏱️ Timing {len(documents)} documents...", file=sys.stderr)
+    before = timed(per_field, documents, args.repeat)
+    after = timed(single_pass, documents, args.repeat)
+
+    results = {
+        'config': {k: v for k, v in vars(args).items() if k != 'output'},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform()},
+        'megabytes': round(sum(len(d) for d in documents) / 1e6, 2),
+        'per_field': before,
+        'single_pass': after,
+        'speedup': round(before['seconds'] / after['seconds'], 2)
+    }
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"✅ Wrote {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
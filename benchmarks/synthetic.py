@@ -0,0 +1,140 @@
+"""
+Synthetic Documents: LlamaParse-style markdown for rate confirmations and BOLs
+Deterministic per (seed, load index) so runs are comparable
+"""
+import random
+from typing import Dict, List
+
+DOC_TYPES = ('carrier_rc', 'shipper_rc', 'bol')
+
+CITIES = [
+    ("Chicago", "IL"), ("Dallas", "TX"), ("Atlanta", "GA"), ("Denver", "CO"),
+    ("Phoenix", "AZ"), ("Columbus", "OH"), ("Memphis", "TN"), ("Reno", "NV"),
+    ("Fresno", "CA"), ("Newark", "NJ"), ("Omaha", "NE"), ("Tampa", "FL")
+]
+CARRIERS = ["Swift Haul LLC", "Blue Ridge Freight", "Prairie Line Inc", "Coastal Carriers",
+            "Iron Horse Logistics", "Summit Transport"]
+SHIPPERS = ["Acme Foods", "Globex Paper", "Initech Supplies", "Umbrella Beverages",
+            "Stark Metals", "Wayne Textiles"]
+COMMODITIES = ["Frozen vegetables", "Paper rolls", "Office furniture", "Bottled water",
+               "Steel coils", "Cotton bales"]
+EQUIPMENT = ["53' Dry Van", "53' Reefer", "48' Flatbed"]
+
+
+def reference_id(load: int) -> str:
+    return f"LD{100000 + load}"
+
+
+def load_facts(load: int, seed: int = 0) -> Dict:
+    """Shared facts of one load (all three documents agree on them)"""
+    rng = random.Random(f"{seed}:{load}")
+    origin, destination = rng.sample(CITIES, 2)
+    month, day = rng.randint(1, 12), rng.randint(1, 27)
+    carrier_pay = rng.randint(8, 40) * 100
+    return {
+        'reference_id': reference_id(load),
+        'origin': origin,
+        'destination': destination,
+        'pickup_date': f"{month:02d}/{day:02d}/2026",
+        'delivery_date': f"{month:02d}/{day + 1:02d}/2026",
+        'carrier': rng.choice(CARRIERS),
+        'shipper': rng.choice(SHIPPERS),
+        'consignee': rng.choice(SHIPPERS),
+        'commodity': rng.choice(COMMODITIES),
+        'equipment': rng.choice(EQUIPMENT),
+        'weight': rng.randint(5, 44) * 1000,
+        'pallets': rng.randint(4, 26),
+        'carrier_pay': carrier_pay,
+        'customer_rate': carrier_pay + rng.randint(2, 8) * 50,
+        'extra_stops': rng.randint(0, 3),
+        'accessorials': rng.randint(1, 12)
+    }
+
+
+def _rate_table(total: int, lines: int, rng: random.Random) -> str:
+    rows = ["| Charge | Description | Amount |", "|---|---|---|"]
+    linehaul = total - 50 * lines
+    rows.append(f"| Line Haul | Flat rate | ${linehaul:,.2f} |")
+    for i in range(lines):
+        rows.append(f"| Accessorial {i + 1} | {rng.choice(['Fuel', 'Detention', 'Lumper', 'Tarp'])} | $50.00 |")
+    rows.append(f"| **Total** | | **${total:,.2f}** |")
+    return "\n".join(rows)
+
+
+def make_document(load: int, doc_type: str, seed: int = 0) -> str:
+    """One document of a load as markdown"""
+    facts = load_facts(load, seed)
+    rng = random.Random(f"{seed}:{load}:{doc_type}")
+    (origin, origin_state), (destination, destination_state) = facts['origin'], facts['destination']
+
+    if doc_type == 'bol':
+        return f"""# Bill of Lading
+
+| Field | Value |
+|---|---|
+| Reference ID | {facts['reference_id']} |
+| Ship Date | {facts['pickup_date']} |
+| Carrier | {facts['carrier']} |
+
+## Shipper
+{facts['shipper']}
+{rng.randint(100, 9999)} Industrial Pkwy, {origin}, {origin_state}
+
+## Consignee
+{facts['consignee']}
+{rng.randint(100, 9999)} Commerce Dr, {destination}, {destination_state}
+
+## Commodity Details
+| Pieces | Description | Weight (lbs) | Class |
+|---|---|---|---|
+| {facts['pallets']} pallets | {facts['commodity']} | {facts['weight']:,} | {rng.choice([50, 55, 70, 85])} |
+
+## Special Instructions
+Driver must call 1 hour before arrival. Seal number {rng.randint(100000, 999999)}.
+"""
+
+    customer = doc_type == 'shipper_rc'
+    total = facts['customer_rate'] if customer else facts['carrier_pay']
+    stops = "\n".join(
+        f"## Stop {i + 3}\nIntermediate drop {i + 1}, {rng.choice(CITIES)[0]}\n"
+        for i in range(facts['extra_stops'])
+    )
+    details = (
+        f"## Customer Details\n{facts['shipper']}\nAccount #{rng.randint(1000, 9999)}\n"
+        if customer else
+        f"## Carrier Details\n{facts['carrier']}\nMC #{rng.randint(100000, 999999)}\n"
+        f"Driver: {rng.choice(['J. Smith', 'M. Lopez', 'A. Chen'])}\n"
+    )
+    return f"""# {'Customer' if customer else 'Carrier'} Rate Confirmation
+
+| Field | Value |
+|---|---|
+| Reference ID | {facts['reference_id']} |
+| Pickup Date | {facts['pickup_date']} |
+| Equipment | {facts['equipment']} |
+
+{details}
+## Pickup (Stop 1)
+{facts['shipper']}, {origin}, {origin_state}
+Appointment: {facts['pickup_date']} 08:00
+
+## Delivery (Stop 2)
+{facts['consignee']}, {destination}, {destination_state}
+Appointment: {facts['delivery_date']} 14:00
+
+{stops}
+## Rate Breakdown
+{_rate_table(total, facts['accessorials'], rng)}
+
+## Commodity Details
+{facts['commodity']}, {facts['weight']:,} lbs, {facts['pallets']} pallets
+"""
+
+
+def document_names(loads: int, start: int = 0) -> List[str]:
+    """Virtual file names ("<load>-<doc_type>.pdf") for FakeParser"""
+    return [
+        f"{load}-{doc_type}.pdf"
+        for load in range(start, start + loads)
+        for doc_type in DOC_TYPES
+    ]
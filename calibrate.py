@@ -0,0 +1,124 @@
+"""
+Confidence Calibration CLI: fit calibration + thresholds, re-score answer logs
+
+    python calibrate.py fit eval.jsonl                        # → data/calibration.json
+    python calibrate.py score answers.jsonl --output scored.jsonl
+    python calibrate.py score answers.jsonl --calibration data/calibration.json
+
+Input is JSONL, one answer per line:
+    {"distances": [0.41, 0.77, 0.93], "answer": "The rate is $1,000 [Source 1]", "correct": true}
+("correct" is only needed for fit). Set CONFIDENCE_CALIBRATION to the fitted
+file to use it in the API.
+"""
+from typing import Dict, Optional
+import argparse
+import json
+import os
+
+import numpy as np
+
+from src.guardrails import (
+    LOW_CONFIDENCE, VERIFY_CONFIDENCE, Calibration,
+    calculate_confidence_batch, check_retrieval_quality_batch, load_labelled
+)
+
+
+def summarize(scores: np.ndarray, labels: np.ndarray, low: float, verify: float) -> Dict:
+    """Accuracy per guardrail band + Brier score"""
+    bands = {
+        'low': scores < low,
+        'verify': (scores >= low) & (scores < verify),
+        'ok': scores >= verify
+    }
+    return {
+        'brier': round(float(np.mean((scores - labels) ** 2)), 4),
+        'bands': {
+            name: {
+                'answers': int(mask.sum()),
+                'accuracy': round(float(labels[mask].mean()), 3) if mask.any() else None
+            }
+            for name, mask in bands.items()
+        }
+    }
+
+
+def fit(path: str, output: str, low_precision: float, verify_precision: float) -> Dict:
+    distances, answers, labels = load_labelled(path)
+    raw = calculate_confidence_batch(distances, answers)
+    y = np.asarray(labels, dtype=float)
+    answered = np.array([len(d) > 0 for d in distances], dtype=bool)  # No results = scored 0
+
+    calibration = Calibration.fit(
+        raw[answered], y[answered],
+        low_precision=low_precision,
+        verify_precision=verify_precision
+    )
+    calibrated = calculate_confidence_batch(distances, answers, calibration)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    calibration.save(output)
+    return {
+        'answers': len(labels),
+        'accuracy': round(float(y.mean()), 3) if len(labels) else None,
+        'calibration': calibration.to_dict(),
+        'before': summarize(raw, y, LOW_CONFIDENCE, VERIFY_CONFIDENCE),
+        'after': summarize(calibrated, y, calibration.low, calibration.verify),
+        'output': output
+    }
+
+
+def score(path: str, calibration_path: Optional[str], output: Optional[str],
+          retrieval_threshold: float) -> Dict:
+    distances, answers, _ = load_labelled(path)
+    calibration = Calibration.load(calibration_path) if calibration_path else None
+    low, verify = (calibration.low, calibration.verify) if calibration else (LOW_CONFIDENCE, VERIFY_CONFIDENCE)
+
+    scores = calculate_confidence_batch(distances, answers, calibration)
+    retrieval_ok = check_retrieval_quality_batch(distances, threshold=retrieval_threshold)
+    bands = np.where(scores < low, 'low', np.where(scores < verify, 'verify', 'ok'))
+
+    if output:
+        with open(path, encoding="utf-8") as src, open(output, "w", encoding="utf-8") as dst:
+            records = (json.loads(line) for line in src if line.strip())
+            for record, value, band, ok in zip(records, scores, bands, retrieval_ok):
+                record.update(confidence=round(float(value), 2), band=str(band), retrieval_ok=bool(ok))
+                dst.write(json.dumps(record) + "\n")
+
+    return {
+        'answers': len(answers),
+        'bands': {name: int((bands == name).sum()) for name in ('low', 'verify', 'ok')},
+        'retrieval_rejected': int((~retrieval_ok).sum()),
+        'mean_confidence': round(float(scores.mean()), 3) if len(answers) else None,
+        'output': output
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fit / apply confidence calibration")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = commands.add_parser("fit", help="Fit calibration from a labelled evaluation file")
+    fit_parser.add_argument("path", help="JSONL with distances, answer, correct")
+    fit_parser.add_argument("--output", default="./data/calibration.json")
+    fit_parser.add_argument("--low-precision", type=float, default=0.5,
+                            help="Answers above the low threshold are correct at least this often")
+    fit_parser.add_argument("--verify-precision", type=float, default=0.9,
+                            help="Answers above the verify threshold are correct at least this often")
+
+    score_parser = commands.add_parser("score", help="Re-score logged answers in bulk")
+    score_parser.add_argument("path", help="JSONL with distances, answer")
+    score_parser.add_argument("--calibration", default=os.getenv("CONFIDENCE_CALIBRATION"))
+    score_parser.add_argument("--output", default=None, help="Write scored JSONL here")
+    score_parser.add_argument("--retrieval-threshold", type=float, default=0.85,
+                              help="Best distance needed to pass the pre-LLM check")
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        stats = fit(args.path, args.output, args.low_precision, args.verify_precision)
+    else:
+        stats = score(args.path, args.calibration, args.output, args.retrieval_threshold)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Bulk Ingestion CLI: Directory / zip archive → parse (process pool) → batched store
+
+    python ingest.py ./backfill/                 # every PDF under a directory
+    python ingest.py ./backfill-2024.zip         # every PDF inside an archive
+    python ingest.py ./samples --parser markdown # offline stand-in (reads <name>.md)
+    python ingest.py ./scans --parser llamaparse # always parse remotely
+
+Interrupted runs resume from the checkpoint file: documents are marked done
+only after their chunks are stored. Archive members are extracted one at a
+time as they are queued and deleted once parsed.
+
+A running API shares the SQLite state (corpus versions, BM25 index,
+extraction records): its cached answers and records for the ingested loads
+go stale at once, and load lookups / keyword search see the new chunks.
+Its Chroma vector index is held in memory, though - semantic search only
+finds the new chunks after the API restarts.
+"""
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.cache import DiskCache, file_sha256
+from src.document_processor import DocumentProcessor
+from src.embeddings import LocalEmbeddingFunction, CachedEmbeddingFunction, EmbeddingCache
+from src.lexical_index import BM25Index
+from src.load_records import LoadRecords
+from src.parsers import make_parser
+from src.shard_router import ShardRouter
+from src.vector_store import VectorStore
+
+_processor: Optional[DocumentProcessor] = None
+
+
+def _init_worker(parser_name: str, use_cache: bool) -> None:
+    """Build one DocumentProcessor per worker process"""
+    global _processor
+    cache = None
+    if use_cache:
+        cache = DiskCache(
+            "./data/parse_cache",
+            max_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "256")) * 1024 * 1024
+        )
+    _processor = DocumentProcessor(
+        api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+        cache=cache,
+        max_chunk_tokens=int(os.getenv("CHUNK_MAX_TOKENS", "400")),
+        chunk_overlap_tokens=int(os.getenv("CHUNK_OVERLAP_TOKENS", "40")),
+        parser=make_parser(
+            parser_name,
+            api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+            workers=0,  # Already one process per worker
+            min_chars_per_page=float(os.getenv("PDF_MIN_CHARS_PER_PAGE", "200"))
+        )
+    )
+
+
+def _parse(file_path: str) -> List[Dict]:
+    """Worker: PDF → chunks"""
+    return asyncio.run(_processor.process_pdf(file_path))
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        """Append-only log of finished document hashes"""
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {json.loads(line)['sha256'] for line in f if line.strip()}
+
+    def mark(self, entries: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(e['sha256'] for e in entries)
+
+
+def find_documents(source: str, workdir: str,
+                   suffix: str) -> Iterator[Tuple[str, str, List[str]]]:
+    """
+    (display name, local path, extracted temp files) for every document in
+    a directory or zip archive; a zip member is extracted only when its
+    document is consumed, with sidecar files sharing its name (e.g. .md)
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(n for n in archive.namelist() if not n.endswith("/"))
+            by_stem = defaultdict(list)
+            for name in names:
+                by_stem[os.path.splitext(name)[0]].append(name)
+            for name in names:
+                if name.lower().endswith(suffix):
+                    members = by_stem[os.path.splitext(name)[0]]
+                    extracted = [archive.extract(member, workdir) for member in members]
+                    yield f"{os.path.basename(source)}:{name}", os.path.join(workdir, name), extracted
+        return
+
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(suffix):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, source), path, []
+
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def build_vector_store() -> VectorStore:
+    """Same store configuration as app.py"""
+    embedding_function = LocalEmbeddingFunction(
+        batch_size=int(os.getenv("EMBED_BATCH_SIZE", "32")),
+        num_threads=int(os.getenv("EMBED_THREADS", "0")) or None
+    )
+    if os.getenv("EMBED_CACHE", "1") == "1":
+        embedding_function = CachedEmbeddingFunction(
+            embedding_function,
+            EmbeddingCache("./data/embedding_cache.db"),
+            model_name=LocalEmbeddingFunction.MODEL_NAME
+        )
+    return VectorStore(
+        max_workers=int(os.getenv("CHROMA_WORKERS", "4")),
+        embedding_function=embedding_function,
+        lexical_index=BM25Index("./data/bm25_index.db"),
+        router=ShardRouter(strategy=os.getenv("SHARD_STRATEGY", "none")),
+        fanout_workers=int(os.getenv("SHARD_FANOUT_WORKERS", "8"))
+    )
+
+
+def ingest(source: str,
+           vector_store: VectorStore,
+           parser: str = "auto",
+           workers: int = None,
+           batch_size: int = 2000,
+           checkpoint_path: str = "./data/ingest_checkpoint.jsonl",
+           replace: bool = False,
+           tenant_id: str = None,
+           use_cache: bool = True,
+           load_records: Optional[LoadRecords] = None) -> Dict:
+    """
+    Parse every document under source and store its chunks
+    load_records: Extraction records to invalidate for the stored loads
+    Returns throughput stats
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint = Checkpoint(checkpoint_path)
+    suffix = ".md" if parser == "markdown" else ".pdf"
+
+    stats = {'documents': 0, 'chunks': 0, 'skipped': 0, 'failed': 0}
+    pending_chunks: List[Dict] = []
+    pending_docs: List[Dict] = []
+    start = time.perf_counter()
+
+    def flush() -> None:
+        """One large add for the buffered chunks, then checkpoint their documents"""
+        if pending_chunks:
+            vector_store.add_chunks(pending_chunks, replace=replace)
+            if load_records is not None:
+                load_records.invalidate(c['metadata'].get('reference_id') for c in pending_chunks)
+        if pending_docs:
+            checkpoint.mark(pending_docs)
+        stats['documents'] += len(pending_docs)
+        stats['chunks'] += len(pending_chunks)
+        pending_chunks.clear()
+        pending_docs.clear()
+
+        elapsed = time.perf_counter() - start
+        print(f"📦 {stats['documents']} docs, {stats['chunks']} chunks "
+              f"({stats['documents'] / elapsed:.1f} docs/s)")
+
+    with tempfile.TemporaryDirectory() as workdir, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(parser, use_cache)) as pool:
+        in_flight, extracted_files = {}, {}
+        documents = find_documents(source, workdir, suffix)
+
+        def submit_next() -> bool:
+            for name, path, extracted in documents:
+                sha256 = file_sha256(path)
+                if sha256 in checkpoint.done:
+                    stats['skipped'] += 1
+                    _remove_files(extracted)
+                    continue
+                future = pool.submit(_parse, path)
+                in_flight[future] = {'name': name, 'sha256': sha256}
+                extracted_files[future] = extracted
+                return True
+            return False
+
+        # Bounded window: a backlog of 10k files never sits in memory at once
+        while len(in_flight) < workers * 2 and submit_next():
+            pass
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                doc = in_flight.pop(future)
+                _remove_files(extracted_files.pop(future))
+                try:
+                    chunks = future.result()
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f"❌ {doc['name']}: {type(e).__name__}: {e}")
+                    continue
+
+                if tenant_id:
+                    chunks = [{**c, 'metadata': {**c['metadata'], 'tenant_id': tenant_id}} for c in chunks]
+                pending_chunks.extend(chunks)
+                pending_docs.append(doc)
+                if len(pending_chunks) >= batch_size:
+                    flush()
+
+            while len(in_flight) < workers * 2 and submit_next():
+                pass
+
+        flush()
+
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = round(elapsed, 2)
+    stats['docs_per_second'] = round(stats['documents'] / elapsed, 2) if elapsed else 0.0
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-ingest logistics documents")
+    parser.add_argument("source", help="Directory or .zip archive of PDFs")
+    parser.add_argument("--parser", default=os.getenv("PDF_PARSER", "auto"),
+                        choices=["auto", "local", "llamaparse", "markdown"],
+                        help="PDF backend; 'auto' parses locally and falls back to LlamaParse "
+                             "for scans; 'markdown' reads pre-rendered <name>.md (offline)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPUs)")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Chunks per store call")
+    parser.add_argument("--checkpoint", default="./data/ingest_checkpoint.jsonl")
+    parser.add_argument("--replace", action="store_true",
+                        help="Drop chunks previously stored for each reference_id + doc_type")
+    parser.add_argument("--tenant-id", default=None)
+    parser.add_argument("--no-cache", action="store_true", help="Skip the parse cache")
+    args = parser.parse_args()
+
+    os.makedirs("./data/parse_cache", exist_ok=True)
+    vector_store = build_vector_store()
+
+    print(f"🚚 Ingesting {args.source} with {args.parser}")
+    stats = ingest(
+        args.source,
+        vector_store,
+        parser=args.parser,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        replace=args.replace,
+        tenant_id=args.tenant_id,
+        use_cache=not args.no_cache,
+        load_records=LoadRecords(os.getenv("LOAD_RECORDS_DB", "./data/load_records.db"))
+    )
+    print(f"✅ Done: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Answer Cache: Semantic cache for RAGEngine.ask
+Keyed on reference_id + retrieval filter + question embedding + corpus version
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation, collapse whitespace"""
+    question = re.sub(r'[^\w\s$.]', ' ', question.lower())
+    question = re.sub(r'\.(?!\d)', ' ', question)  # Keep decimals like 1.5
+    return " ".join(question.split())
+
+
+class AnswerCache:
+    def __init__(self,
+                 similarity_threshold: float = 0.95,
+                 ttl_seconds: float = 3600,
+                 max_entries: int = 1000):
+        """
+        similarity_threshold: Cosine similarity at which two questions in
+        the same scope are treated as the same question
+        ttl_seconds: Maximum age of an entry
+        max_entries: LRU bound across all scopes
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._scopes: Dict[str, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _scope(reference_id: Optional[str], filter_dict: Dict) -> str:
+        return json.dumps({'reference_id': reference_id, 'filter': filter_dict}, sort_keys=True)
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def get(self,
+            reference_id: Optional[str],
+            filter_dict: Dict,
+            question: str,
+            embedding: List[float],
+            version) -> Optional[Dict]:
+        """Cached result for an equivalent question in the same scope, or None"""
+        scope = self._scope(reference_id, filter_dict)
+        normalized = normalize_question(question)
+        query = self._unit(embedding)
+        now = time.time()
+
+        with self._lock:
+            best_id, best_score = None, -1.0
+            for entry_id in list(self._scopes.get(scope, ())):
+                entry = self._entries[entry_id]
+
+                # Expired or built on an older corpus - drop it
+                if entry['version'] != version or now - entry['created'] > self.ttl_seconds:
+                    self._remove(entry_id)
+                    continue
+
+                if entry['question'] == normalized:
+                    best_id, best_score = entry_id, 1.0
+                    break
+
+                score = float(np.dot(entry['embedding'], query))
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_id)
+            self.hits += 1
+            if self._entries[best_id]['question'] != normalized:
+                self.semantic_hits += 1
+            return self._entries[best_id]['result']
+
+    def set(self,
+            reference_id: Optional[str],
+            filter_dict: Dict,
+            question: str,
+            embedding: List[float],
+            version,
+            result: Dict) -> None:
+        """Store a result for this question and scope"""
+        scope = self._scope(reference_id, filter_dict)
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                'scope': scope,
+                'question': normalize_question(question),
+                'embedding': self._unit(embedding),
+                'version': version,
+                'created': time.time(),
+                'result': result
+            }
+            self._scopes.setdefault(scope, set()).add(entry_id)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: int) -> None:
+        """Drop an entry (lock held)"""
+        entry = self._entries.pop(entry_id)
+        scope_ids = self._scopes[entry['scope']]
+        scope_ids.discard(entry_id)
+        if not scope_ids:
+            del self._scopes[entry['scope']]
+
+    def invalidate(self, reference_id: Optional[str] = None) -> int:
+        """Drop entries for one reference_id (or everything); returns count"""
+        with self._lock:
+            if reference_id is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._scopes.clear()
+                return removed
+
+            doomed = [
+                entry_id for entry_id, entry in self._entries.items()
+                if json.loads(entry['scope'])['reference_id'] == reference_id
+            ]
+            for entry_id in doomed:
+                self._remove(entry_id)
+            return len(doomed)
+
+    def stats(self) -> Dict:
+        """Hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
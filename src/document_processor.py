@@ -1,38 +1,85 @@
 """
 Document Processing: Parse PDF → Markdown → Chunks
 """
-import nest_asyncio
-nest_asyncio.apply()
-
-from llama_parse import LlamaParse
-from typing import List, Dict
+from typing import List, Dict, Optional
+import asyncio
+import hashlib
 import re
-from .utils import extract_reference_id, detect_doc_type
+from .cache import DiskCache, content_key, file_sha256
+from .metrics import span
+from .parsers import LlamaParseParser
+from .utils import scan_document, identify_section, count_tokens, load_tokenizer
+
+# Bump when chunk layout changes so cached chunks are not reused
+CHUNKER_VERSION = 3
+
+TABLE_SEPARATOR = re.compile(r'^\s*\|?\s*:?-{3,}')
 
 class DocumentProcessor:
-    def __init__(self, api_key: str):
-        """Initialize with LlamaParse"""
-        self.parser = LlamaParse(
-            api_key=api_key,
-            result_type="markdown",
-            parsing_instruction="""
-            This is a logistics document. Preserve all tables.
-            Maintain headers for sections like Pickup, Delivery, Rate Breakdown.
-            """
+    def __init__(self,
+                 api_key: str,
+                 cache: Optional[DiskCache] = None,
+                 max_chunk_tokens: int = 400,
+                 chunk_overlap_tokens: int = 40,
+                 parser=None):
+        """
+        Initialize with LlamaParse
+        
+        cache: Optional parse cache; re-uploads of the same PDF bytes with
+        the same parser settings skip LlamaParse entirely
+        max_chunk_tokens: Budget per section chunk; larger sections are split
+        at table-row / paragraph boundaries
+        chunk_overlap_tokens: Trailing rows/paragraphs repeated in the next split
+        parser: PDF → markdown backend (see src/parsers.py); defaults to LlamaParse
+        """
+        self.parser = parser or LlamaParseParser(api_key)
+        self.cache = cache
+        self.max_chunk_tokens = max_chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        # Chunk boundaries depend on the tokenizer: load it now, key the cache on it
+        self.tokenizer = load_tokenizer()
+    
+    def cache_key(self, file_path: str) -> str:
+        """Content address: SHA-256 of PDF bytes + parser settings"""
+        return content_key(
+            file_sha256(file_path),
+            {
+                **self.parser.settings(),
+                'chunker_version': CHUNKER_VERSION,
+                'tokenizer': self.tokenizer,
+                'max_chunk_tokens': self.max_chunk_tokens,
+                'chunk_overlap_tokens': self.chunk_overlap_tokens
+            }
         )
     
-    def process_pdf(self, file_path: str) -> List[Dict]:
+    def invalidate_cache(self, file_path: str) -> bool:
+        """Drop the cached parse for this PDF (forces a fresh LlamaParse run)"""
+        if self.cache is None:
+            return False
+        return self.cache.invalidate(self.cache_key(file_path))
+    
+    async def process_pdf(self, file_path: str) -> List[Dict]:
         """
         Main method: PDF → Structured chunks
         Returns: List of chunks with content + metadata
         """
-        # Parse PDF to markdown
-        documents = self.parser.load_data(file_path)
-        markdown = documents[0].text
+        # Hashing and cache reads are disk I/O - keep them off the event loop
+        key = None
+        if self.cache is not None:
+            key = await asyncio.to_thread(self.cache_key, file_path)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                print(f"\n⚡ Parse cache hit: {file_path}")
+                return cached['chunks']
+        
+        # Parse PDF to markdown (native async - no nested event loop needed)
+        with span("parse"):
+            markdown = await self.parser.aparse(file_path)
         
-        # Extract metadata
-        reference_id = extract_reference_id(markdown)
-        doc_type = detect_doc_type(markdown)
+        # Extract metadata + section types (one pass over the markdown)
+        scan = scan_document(markdown)
+        reference_id = scan['reference_id']
+        doc_type = scan['doc_type']
         
         # DEBUG
         print(f"\n📄 Processing: {file_path}")
@@ -42,16 +89,30 @@ class DocumentProcessor:
         
         metadata = {
             'reference_id': reference_id if reference_id else 'UNKNOWN',
-            'doc_type': doc_type
+            'doc_type': doc_type,
+            'pickup_date': scan['pickup_date']  # Month shard routing
         }
         
         # Split into chunks
-        chunks = self._chunk_by_sections(markdown, metadata)
+        with span("chunk"):
+            chunks = self._chunk_by_sections(markdown, metadata, scan['section_types'])
+        
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, {'markdown': markdown, 'chunks': chunks})
         
         return chunks
     
-    def _chunk_by_sections(self, markdown: str, metadata: Dict) -> List[Dict]:
-        """Split markdown by sections, keep each section intact"""
+    def _chunk_by_sections(self, markdown: str, metadata: Dict,
+                           section_types: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Split markdown by sections, within a token budget
+        section_types: From scan_document (aligned with the ## split);
+        classified per section when not given
+        
+        The header section is stored ONCE as a parent chunk; section chunks
+        link to it via header_id and the header is re-attached only when a
+        chunk goes into a prompt (see RAGEngine).
+        """
         chunks = []
         
         # Split by markdown headers (##)
@@ -59,6 +120,9 @@ class DocumentProcessor:
         
         # First section is header info (contains basic details)
         header = sections[0].strip()
+        header_id = hashlib.sha256(
+            f"{metadata.get('reference_id')}|{metadata.get('doc_type')}|{header}".encode('utf-8')
+        ).hexdigest()[:16]
         
         # Create a chunk for the header (important metadata)
         chunks.append({
@@ -67,54 +131,142 @@ class DocumentProcessor:
                 **metadata,
                 'chunk_id': 0,
                 'section_type': 'header',
-                'has_table': False
+                'has_table': False,
+                'header_id': header_id
             }
         })
         
         # Process remaining sections
         for i, section in enumerate(sections[1:], start=1):
-            # Add header context to each chunk for better retrieval
-            chunk_content = f"{header}\n\n{section}"
+            section_type = section_types[i] if section_types else identify_section(section)
+            pieces = self._split_section(section)
             
-            chunk = {
-                'content': chunk_content,
-                'metadata': {
+            for part, piece in enumerate(pieces):
+                chunk_metadata = {
                     **metadata,
-                    'chunk_id': i,
-                    'section_type': self._identify_section(section),
-                    'has_table': '|' in section  # Markdown tables have |
+                    'chunk_id': len(chunks),
+                    'section_type': section_type,
+                    'has_table': '|' in piece,  # Markdown tables have |
+                    'header_id': header_id
                 }
-            }
-            chunks.append(chunk)
+                if len(pieces) > 1:
+                    chunk_metadata['part'] = part
+                chunks.append({'content': piece, 'metadata': chunk_metadata})
         
         # If no sections found, create single chunk
         if len(chunks) == 1:  # Only header chunk
-            chunks.append({
-                'content': markdown,
-                'metadata': {**metadata, 'chunk_id': 1, 'section_type': 'full_document', 'has_table': '|' in markdown}
-            })
+            for piece in self._split_section(markdown):
+                chunks.append({
+                    'content': piece,
+                    'metadata': {**metadata, 'chunk_id': len(chunks), 'section_type': 'full_document', 'has_table': '|' in piece}
+                })
         
         return chunks
     
-    def _identify_section(self, section: str) -> str:
-        """Identify section type by keywords"""
-        section_lower = section.lower()
-        
-        if 'rate' in section_lower and 'breakdown' in section_lower:
-            return 'rates'
-        elif 'pickup' in section_lower or 'stop' in section_lower and '1' in section:
-            return 'pickup'
-        elif 'delivery' in section_lower or 'drop' in section_lower or ('stop' in section_lower and '2' in section):
-            return 'delivery'
-        elif 'driver' in section_lower:
-            return 'driver_details'
-        elif 'instruction' in section_lower:
-            return 'instructions'
-        elif 'carrier details' in section_lower:
-            return 'carrier_info'
-        elif 'customer details' in section_lower:
-            return 'customer_info'
-        elif 'commodity' in section_lower or 'weight' in section_lower:
-            return 'commodity_details'
-        else:
-            return 'general'
\ No newline at end of file
+    def _split_section(self, section: str) -> List[str]:
+        """
+        Split a section into pieces within max_chunk_tokens
+        
+        Breaks only between table rows or paragraphs. Each piece keeps the
+        section title, and a piece starting mid-table repeats the table's
+        header row. chunk_overlap_tokens of trailing units carry over.
+        """
+        if count_tokens(section) <= self.max_chunk_tokens:
+            return [section]
+        
+        lines = section.split('\n')
+        title = lines[0] if lines[0].startswith('#') else ''
+        body = lines[1:] if title else lines
+        budget = max(self.max_chunk_tokens - count_tokens(title), 1)
+        
+        units = []
+        for unit in self._section_units(body):
+            units.extend(self._split_oversized(unit, budget))
+        
+        pieces = []
+        current, current_tokens = [], 0
+        for unit in units:
+            if current and current_tokens + unit['tokens'] > budget:
+                pieces.append(self._render_units(title, current))
+                
+                # Carry trailing units as overlap (never a whole piece)
+                carry, carry_tokens = [], 0
+                for prev in reversed(current[1:]):
+                    if carry_tokens + prev['tokens'] > self.chunk_overlap_tokens:
+                        break
+                    carry.insert(0, prev)
+                    carry_tokens += prev['tokens']
+                current, current_tokens = carry, carry_tokens
+            
+            current.append(unit)
+            current_tokens += unit['tokens']
+        
+        if current:
+            pieces.append(self._render_units(title, current))
+        return pieces
+    
+    def _section_units(self, lines: List[str]) -> List[Dict]:
+        """Group lines into units: one per table row, one per paragraph"""
+        units = []
+        paragraph = []
+        table_header = None
+        table_id = 0
+        
+        def flush_paragraph():
+            if paragraph:
+                text = '\n'.join(paragraph)
+                units.append({'text': text, 'table': None, 'table_header': None, 'tokens': count_tokens(text)})
+                paragraph.clear()
+        
+        for i, line in enumerate(lines):
+            if line.lstrip().startswith('|'):
+                flush_paragraph()
+                if table_header is None:
+                    # New table: header row (+ separator row) is its own unit
+                    table_id += 1
+                    table_header = line
+                    if i + 1 < len(lines) and TABLE_SEPARATOR.match(lines[i + 1]):
+                        continue
+                    units.append({'text': line, 'table': table_id, 'table_header': None, 'tokens': count_tokens(line)})
+                elif TABLE_SEPARATOR.match(line) and '\n' not in table_header:
+                    table_header = f"{table_header}\n{line}"
+                    units.append({'text': table_header, 'table': table_id, 'table_header': None, 'tokens': count_tokens(table_header)})
+                else:
+                    units.append({'text': line, 'table': table_id, 'table_header': table_header, 'tokens': count_tokens(line)})
+            else:
+                table_header = None
+                if line.strip():
+                    paragraph.append(line)
+                else:
+                    flush_paragraph()
+        
+        flush_paragraph()
+        return units
+    
+    def _split_oversized(self, unit: Dict, budget: int) -> List[Dict]:
+        """Hard-split a single unit (e.g. huge paragraph) that exceeds the budget"""
+        if unit['tokens'] <= budget:
+            return [unit]
+        
+        words = unit['text'].split(' ')
+        words_per_piece = max(int(len(words) * budget / unit['tokens']), 1)
+        parts = []
+        for i in range(0, len(words), words_per_piece):
+            text = ' '.join(words[i:i + words_per_piece])
+            parts.append({**unit, 'text': text, 'tokens': count_tokens(text)})
+        return parts
+    
+    @staticmethod
+    def _render_units(title: str, units: List[Dict]) -> str:
+        """Join units back into markdown; re-add table header when starting mid-table"""
+        parts = [title] if title else []
+        previous_table = None
+        for unit in units:
+            if unit['table'] is not None and unit['table'] == previous_table:
+                parts[-1] = f"{parts[-1]}\n{unit['text']}"
+            elif unit['table_header']:
+                parts.append(f"{unit['table_header']}\n{unit['text']}")
+            else:
+                parts.append(unit['text'])
+            previous_table = unit['table']
+        return '\n\n'.join(parts)
@@ -0,0 +1,168 @@
+"""
+Embeddings: Pluggable embedding functions for VectorStore
+Any chromadb EmbeddingFunction works; these add batching, threads and caching
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+
+class LocalEmbeddingFunction(ONNXMiniLM_L6_V2):
+    """
+    all-MiniLM-L6-v2 on CPU (same model/vectors as Chroma's default)
+
+    Splits input into batches of batch_size and runs them on num_threads
+    worker threads against one shared ONNX session (run() releases the GIL).
+    Batches are padded to their longest text instead of a fixed 256 tokens;
+    pooling is attention-masked, so the vectors are unchanged.
+    """
+
+    def __init__(self, batch_size: int = 32, num_threads: Optional[int] = None):
+        super().__init__()
+        self.batch_size = batch_size
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.num_threads,
+            thread_name_prefix="embed"
+        )
+
+    @cached_property
+    def model(self):
+        self._download_model_if_not_exists()
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.intra_op_num_threads = 1  # Parallelism comes from batches across threads
+        so.inter_op_num_threads = 1
+        return self.ort.InferenceSession(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "model.onnx"),
+            providers=["CPUExecutionProvider"],
+            sess_options=so,
+        )
+
+    @cached_property
+    def tokenizer(self):
+        self._download_model_if_not_exists()
+        tokenizer = self.Tokenizer.from_file(
+            os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "tokenizer.json")
+        )
+        tokenizer.enable_truncation(max_length=256)
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")  # Pad to longest in batch
+        return tokenizer
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        if not texts:
+            return []
+
+        batches = [
+            texts[i:i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        results = self._pool.map(self._embed_batch, batches)
+        return [row for batch in results for row in batch]
+
+    def _embed_batch(self, batch: List[str]) -> np.ndarray:
+        """One session call: tokenize, run, attention-masked mean pool, normalize"""
+        encoded = self.tokenizer.encode_batch(batch)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+
+        last_hidden_state = self.model.run(None, {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.zeros_like(input_ids),
+        })[0]
+
+        mask = np.expand_dims(attention_mask, -1).astype(np.float32)
+        embeddings = np.sum(last_hidden_state * mask, 1) / np.clip(mask.sum(1), 1e-9, None)
+        return self._normalize(embeddings).astype(np.float32)
+
+
+class EmbeddingCache:
+    def __init__(self, db_path: str = "./data/embedding_cache.db"):
+        """On-disk text-hash → float32 vector store (SQLite)"""
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+            )
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # Stay under SQLite's variable limit
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                found.update((k, np.frombuffer(v, dtype=np.float32)) for k, v in rows)
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def set_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in items.items()]
+            )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Wrap any embedding function with an EmbeddingCache
+
+    Identical texts (e.g. repeated section headers, re-uploads) are
+    embedded once, across batches and restarts.
+    """
+
+    def __init__(self, inner: EmbeddingFunction, cache: EmbeddingCache, model_name: str = None):
+        self.inner = inner
+        self.cache = cache
+        self.model_name = model_name or type(inner).__name__
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        texts = list(input)
+        keys = [self._key(t) for t in texts]
+        found = self.cache.get_many(keys)
+
+        # Embed each missing text once, even if repeated within the batch
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            vectors = self.inner(list(missing.values()))
+            computed = {
+                key: np.asarray(v, dtype=np.float32)
+                for key, v in zip(missing.keys(), vectors)
+            }
+            self.cache.set_many(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
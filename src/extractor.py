@@ -1,63 +1,190 @@
 
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
+from .cache import DiskCache, content_key
+from .metrics import record_usage, span
+from .prompt_budget import PromptBudget
+from .single_flight import SingleFlight
+from .utils import count_tokens
+
+EXTRACTION_MODEL = "gpt-4"
+
+# Define schema (same for all, but prompt varies)
+EXTRACTION_SCHEMA = {
+    "shipment_id": "string or null",
+    "shipper": "string or null",
+    "consignee": "string or null",
+    "pickup_datetime": "ISO format or null",
+    "delivery_datetime": "ISO format or null",
+    "equipment_type": "string or null",
+    "mode": "string or null",
+    "rate": "number or null",
+    "currency": "string or null",
+    "weight": "number or null",
+    "carrier_name": "string or null"
+}
+
+# Longest backoff the OpenAI SDK sleeps between its retries (Retry-After aside)
+SDK_MAX_RETRY_DELAY = 8.0
 
 class StructuredExtractor:
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self,
+                 api_key: str,
+                 max_concurrency: int = 4,
+                 timeout: float = 60.0,
+                 max_retries: int = 2,
+                 cache: Optional[DiskCache] = None,
+                 coalesce: bool = True,
+                 prompt_budget: Optional[PromptBudget] = None,
+                 client: Optional[AsyncOpenAI] = None):
+        """
+        max_concurrency: GPT-4 calls in flight at once (shared across requests)
+        timeout: Seconds allowed per GPT-4 attempt (the client's own timeout)
+        max_retries: SDK retries for the private client (a passed client
+        keeps its own); the only retry layer
+        cache: Optional per-doc-type result cache keyed by content hash
+        coalesce: Concurrent requests for the same doc-type content share
+        one GPT-4 call
+        prompt_budget: Optional token budget per doc-type prompt (document
+        order is kept; the tail goes first)
+        client: OpenAI client to use (e.g. from OpenAIClientFactory);
+        default: a private AsyncOpenAI(api_key)
+        """
+        self.client = client or AsyncOpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
+        self.timeout = timeout
+        # Overall deadline covers every SDK attempt + its backoff, so it never
+        # cancels a retry in progress
+        retries = getattr(getattr(self.client, 'raw', self.client), 'max_retries', 0)
+        self.deadline = timeout * (retries + 1) + SDK_MAX_RETRY_DELAY * retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.cache = cache
+        self._flights = SingleFlight("extract") if coalesce else None
+        self.prompt_budget = prompt_budget
     
-    def extract(self, chunks: List[Dict]) -> Dict:
+    async def extract(self, chunks: List[Dict]) -> Dict:
         """
         FIXED: Extract per document type, then merge
         
         chunks: List of chunks with metadata (from vector store query)
         Returns: Merged JSON with all 11 fields
         """
+        record = await self.extract_record(chunks)
+        return record['merged']
+    
+    async def extract_record(self, chunks: List[Dict]) -> Dict:
+        """
+        extract() keeping the per-doc-type results
+        Returns: {'by_doc_type': {doc_type: fields}, 'merged': merged JSON}
+        """
         # Step 1: Group chunks by document type
         doc_groups = self._group_by_doc_type(chunks)
         
-        # Step 2: Extract from each document type separately
-        extractions = {}
-        for doc_type, doc_chunks in doc_groups.items():
-            content = "\n\n".join([c['content'] for c in doc_chunks])
-            extractions[doc_type] = self._extract_from_content(content, doc_type)
+        # Step 2: Extract from each document type concurrently
+        # (only doc types whose content changed since the last run)
+        doc_types = list(doc_groups.keys())
+        with span("extract"):
+            results = await asyncio.gather(*[
+                self._extract_cached(self._doc_content(doc_groups[doc_type], doc_type), doc_type)
+                for doc_type in doc_types
+            ])
+        extractions = dict(zip(doc_types, results))
         
-        # Step 3: Merge with priority rules
+        # Step 3: Merge with priority rules (once all types are done)
         merged = self._merge_extractions(extractions)
         
-        return merged
+        return {'by_doc_type': extractions, 'merged': merged}
+    
+    def _doc_content(self, doc_chunks: List[Dict], doc_type: str) -> str:
+        """One doc type's chunks as prompt content (fitted to the budget, if any)"""
+        contents = [c['content'] for c in doc_chunks]
+        if self.prompt_budget is not None:
+            reserved = count_tokens(self._build_prompt("", doc_type))
+            contents, _ = self.prompt_budget.fit(contents, reserved_tokens=reserved)
+        return "\n\n".join([c for c in contents if c])
+    
+    async def _extract_cached(self, content: str, doc_type: str) -> Dict:
+        """Reuse a stored (or in-flight) extraction when this doc type's content is unchanged"""
+        key = content_key("extract", EXTRACTION_MODEL, doc_type, content)
+        if self._flights is None:
+            return await self._extract_stored(key, content, doc_type)
+        return await self._flights.do(key, lambda: self._extract_stored(key, content, doc_type))
+    
+    async def _extract_stored(self, key: str, content: str, doc_type: str) -> Dict:
+        if self.cache is None:
+            return await self._extract_bounded(content, doc_type)
+        
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            print(f"⚡ Extraction cache hit: {doc_type}")
+            return cached
+        
+        extracted = await self._extract_bounded(content, doc_type)
+        
+        # Don't pin a failed parse (all-null fallback) in the cache
+        if any(v is not None for v in extracted.values()):
+            await asyncio.to_thread(self.cache.set, key, extracted)
+        return extracted
+    
+    async def _extract_bounded(self, content: str, doc_type: str) -> Dict:
+        """Extraction call under the concurrency limit and the overall deadline"""
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                self._extract_from_content(content, doc_type),
+                timeout=self.deadline
+            )
     
     def _group_by_doc_type(self, chunks: List[Dict]) -> Dict[str, List[Dict]]:
-        """Group chunks by document type"""
+        """Group chunks by document type, in document order"""
         groups = {}
         for chunk in chunks:
             doc_type = chunk['metadata'].get('doc_type', 'unknown')
             if doc_type not in groups:
                 groups[doc_type] = []
             groups[doc_type].append(chunk)
+        
+        # Retrieval order varies between calls; sort so the same chunks
+        # always produce the same content (and cache key)
+        for doc_chunks in groups.values():
+            doc_chunks.sort(key=self._chunk_order)
         return groups
     
-    def _extract_from_content(self, content: str, doc_type: str) -> Dict:
+    @staticmethod
+    def _chunk_order(chunk: Dict):
+        chunk_id = str(chunk['metadata'].get('chunk_id', ''))
+        return (int(chunk_id) if chunk_id.isdigit() else -1, chunk['content'])
+    
+    async def _extract_from_content(self, content: str, doc_type: str) -> Dict:
         """
         Extract from a single document type
         Uses doc_type to guide extraction
         """
-        # Define schema (same for all, but prompt varies)
-        schema = {
-            "shipment_id": "string or null",
-            "shipper": "string or null",
-            "consignee": "string or null",
-            "pickup_datetime": "ISO format or null",
-            "delivery_datetime": "ISO format or null",
-            "equipment_type": "string or null",
-            "mode": "string or null",
-            "rate": "number or null",
-            "currency": "string or null",
-            "weight": "number or null",
-            "carrier_name": "string or null"
-        }
+        prompt = self._build_prompt(content, doc_type)
         
+        response = await self.client.chat.completions.create(
+            model=EXTRACTION_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0
+        )
+        record_usage(EXTRACTION_MODEL, getattr(response, 'usage', None))
+        
+        # Parse JSON
+        result_text = response.choices[0].message.content
+        if "```json" in result_text:
+            result_text = result_text.split("```json")[1].split("```")[0]
+        
+        try:
+            extracted = json.loads(result_text)
+        except json.JSONDecodeError:
+            # Fallback: return empty schema
+            extracted = {k: None for k in EXTRACTION_SCHEMA.keys()}
+        
+        return extracted
+    
+    @staticmethod
+    def _build_prompt(content: str, doc_type: str) -> str:
+        """Extraction prompt for one doc type's content"""
         # Customize prompt based on doc type
         if doc_type == 'carrier_rc':
             rate_instruction = "For 'rate': Extract CARRIER PAY (what carrier receives), NOT customer rate"
@@ -66,12 +193,12 @@ class StructuredExtractor:
         else:
             rate_instruction = "For 'rate': Extract the main rate/charge amount"
         
-        prompt = f"""Extract logistics information from this {doc_type.upper()} document:
+        return f"""Extract logistics information from this {doc_type.upper()} document:
 
 {content}
 
 Return JSON with these fields (use null if not found):
-{json.dumps(schema, indent=2)}
+{json.dumps(EXTRACTION_SCHEMA, indent=2)}
 
 RULES:
 - Extract ONLY explicit information, do not infer
@@ -82,25 +209,6 @@ RULES:
 - For shipper/consignee, extract the NAME, not full address
 
 JSON:"""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0
-        )
-        
-        # Parse JSON
-        result_text = response.choices[0].message.content
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0]
-        
-        try:
-            extracted = json.loads(result_text)
-        except json.JSONDecodeError:
-            # Fallback: return empty schema
-            extracted = {k: None for k in schema.keys()}
-        
-        return extracted
     
     def _merge_extractions(self, extractions: Dict[str, Dict]) -> Dict:
         """
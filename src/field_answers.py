@@ -0,0 +1,130 @@
+"""
+Field Answers: Templated answers for questions that map onto one extracted field
+("What is the carrier rate?", "What is the weight?", "Who is the carrier?")
+Anything else (free-form, verification, multi-part) returns None → LLM
+"""
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from .metrics import LLM_CALLS_SAVED
+from .retrieval_gate import question_keywords
+
+FIELD_ANSWER_CONFIDENCE = 0.9
+
+# (field, doc types to read it from (None = merged), template, required words, allowed words)
+# A question qualifies when its content words contain one required set and
+# nothing outside the allowed words ("delivery address" is not "delivery date")
+FIELD_QUESTIONS: List[Tuple[str, Optional[Tuple[str, ...]], str, Tuple[Set[str], ...], Set[str]]] = [
+    ('rate', ('carrier_rc', ), "The carrier rate (carrier pay) is {value} [Source 1].",
+     ({'carrier', 'rate'}, {'carrier', 'pay'}), {'carrier', 'rate', 'pay', 'paid', 'amount', 'total'}),
+    ('rate', ('shipper_rc', ), "The customer rate is {value} [Source 1].",
+     ({'customer', 'rate'}, {'shipper', 'rate'}),
+     {'customer', 'shipper', 'rate', 'charge', 'charged', 'pays', 'amount', 'total'}),
+    ('margin', None, "The margin is {value} (customer rate minus carrier pay).",
+     ({'margin'}, {'profit'}), {'margin', 'profit', 'gross'}),
+    ('rate', ('shipper_rc', 'carrier_rc'),
+     "There are two rates: the customer rate is {value} [Source 1] and the carrier pay is {value2} [Source 2].",
+     ({'rate'}, ), {'rate', 'total', 'amount'}),
+    ('weight', None, "The weight is {value} [Source 1].",
+     ({'weight'}, {'weigh'}), {'weight', 'weigh', 'total', 'gross', 'heavy'}),
+    ('equipment_type', None, "The equipment is {value} [Source 1].",
+     ({'equipment'}, ), {'equipment', 'type', 'trailer'}),
+    ('carrier_name', None, "The carrier is {value} [Source 1].",
+     ({'carrier'}, ), {'carrier', 'name', 'company', 'trucking'}),
+    ('consignee', None, "The consignee is {value} [Source 1].",
+     ({'consignee'}, {'receiver'}), {'consignee', 'receiver', 'name'}),
+    ('shipper', None, "The shipper is {value} [Source 1].",
+     ({'shipper'}, ), {'shipper', 'name'}),
+    ('pickup_datetime', None, "Pickup is scheduled for {value} [Source 1].",
+     ({'pickup'}, {'pick'}), {'pickup', 'pick', 'date', 'time', 'scheduled', 'appointment'}),
+    ('delivery_datetime', None, "Delivery is scheduled for {value} [Source 1].",
+     ({'delivery'}, {'deliver'}, {'delivered'}),
+     {'delivery', 'deliver', 'delivered', 'date', 'time', 'scheduled', 'appointment', 'due'}),
+    ('mode', None, "The mode is {value} [Source 1].",
+     ({'mode'}, ), {'mode', 'transport', 'shipping'}),
+]
+FILLER = {'much'}  # "How much is the carrier rate?"
+# Verification / comparison / multi-part questions always go to the LLM
+# (same/across are retrieval stopwords, so check the raw question)
+FREE_FORM = re.compile(
+    r'\b(same|consistent|match(es)?|across|compare|differ\w*|why|explain|and|or|vs|versus)\b|,'
+)
+
+
+def classify_question(question: str) -> Optional[Tuple[str, Optional[Tuple[str, ...]], str]]:
+    """(field, doc types, template) for a single-field question, else None"""
+    if FREE_FORM.search(question.lower()):
+        return None
+    words = question_keywords(question) - FILLER
+    if not words:
+        return None
+    for field, doc_types, template, required, allowed in FIELD_QUESTIONS:
+        if words <= allowed and any(r <= words for r in required):
+            return field, doc_types, template
+    return None
+
+
+def _format(field: str, value, currency: Optional[str] = None) -> str:
+    if field in ('rate', 'margin') and isinstance(value, (int, float)):
+        amount = f"${value:,.2f}"
+        return amount if currency in (None, 'USD') else f"{amount} {currency}"
+    if field == 'weight' and isinstance(value, (int, float)):
+        return f"{value:,.0f}" if float(value).is_integer() else f"{value:,}"
+    return str(value)
+
+
+def _source(field: str, value: str, doc_type: Optional[str]) -> Dict:
+    return {
+        'content': f"{field}: {value}",
+        'doc_type': doc_type,
+        'section': 'extracted_fields',
+        'distance': 0.0
+    }
+
+
+def answer_from_record(question: str, record: Dict) -> Optional[Dict]:
+    """
+    ask()-shaped result from a load record ({'by_doc_type', 'merged'}),
+    or None when the question isn't a single-field question or the field
+    wasn't extracted
+    """
+    classified = classify_question(question)
+    if classified is None:
+        return None
+    field, doc_types, template = classified
+    merged = record.get('merged') or {}
+    by_doc_type = record.get('by_doc_type') or {}
+
+    if field == 'margin':
+        value = (merged.get('_metadata') or {}).get('margin')
+        if value is None:
+            return None
+        sources = [
+            _source('rate', _format('rate', by_doc_type.get(dt, {}).get('rate')), dt)
+            for dt in ('shipper_rc', 'carrier_rc')
+        ]
+        answer = template.format(value=_format(field, value))
+    elif doc_types is None:
+        value = merged.get(field)
+        if value in (None, ""):
+            return None
+        # Cite the first doc type that has the merged value
+        doc_type = next((dt for dt, fields in by_doc_type.items() if fields.get(field) == value), None)
+        text = _format(field, value, merged.get('currency'))
+        sources = [_source(field, text, doc_type)]
+        answer = template.format(value=text)
+    else:
+        values = [by_doc_type.get(dt, {}).get(field) for dt in doc_types]
+        if any(v in (None, "") for v in values):
+            return None
+        texts = [_format(field, v, by_doc_type[dt].get('currency')) for v, dt in zip(values, doc_types)]
+        sources = [_source(field, t, dt) for t, dt in zip(texts, doc_types)]
+        answer = template.format(value=texts[0], value2=texts[-1])
+
+    LLM_CALLS_SAVED.inc(reason="field_answer")
+    print(f"⚡ Field answer ({field}): {question}")
+    return {
+        'answer': answer,
+        'confidence': FIELD_ANSWER_CONFIDENCE,
+        'sources': sources
+    }
@@ -1,8 +1,22 @@
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence, Tuple
+import json
 import re
 
-def calculate_confidence(question: str, results: List[Dict], answer: str) -> float:
+import numpy as np
+
+# Confidence = weighted mix of retrieval, chunk agreement and answer quality
+DISTANCE_SCALE = 2.5  # Relaxed from 2.0 to 2.5
+AGREEMENT_K = 3
+WEIGHTS = (0.3, 0.2, 0.5)  # retrieval, agreement, answer quality
+LOW_CONFIDENCE = 0.4   # Was 0.5
+VERIFY_CONFIDENCE = 0.65  # Was 0.7
+
+DOLLAR_AMOUNT = re.compile(r'\$[\d,]+')
+NUMBER = re.compile(r'\d+')
+
+def calculate_confidence(question: str, results: List[Dict], answer: str,
+                         calibration: Optional["Calibration"] = None) -> float:
     """
     Calculate confidence score (0-1)
     UPDATED: More generous scoring for good retrievals
@@ -10,63 +24,91 @@ def calculate_confidence(question: str, results: List[Dict], answer: str) -> flo
     if not results:
         return 0.0
     
+    scores = calculate_confidence_batch(
+        [[r['distance'] for r in results[:AGREEMENT_K]]], [answer], calibration
+    )
+    return round(float(scores[0]), 2)
+
+def calculate_confidence_batch(distances: Sequence[Sequence[float]], answers: Sequence[str],
+                               calibration: Optional["Calibration"] = None) -> np.ndarray:
+    """
+    Confidence for many answers at once (unrounded, 0-1)
+    
+    distances: Per answer, retrieval distances best first (only the top
+    AGREEMENT_K are used; rows may be ragged or empty)
+    calibration: Map raw scores to fitted probabilities of being correct
+    """
+    top = _distance_matrix(distances, AGREEMENT_K)
+    has_results = ~np.isnan(top[:, 0])
+    
     # Metric 1: Top retrieval similarity
     # ChromaDB distances typically 0.5-2.0 for good matches
-    top_distance = results[0]['distance']
-    retrieval_score = max(0, 1 - min(top_distance / 2.5, 1.0))  # Relaxed from 2.0 to 2.5
+    retrieval_score = np.maximum(0, 1 - np.minimum(top[:, 0] / DISTANCE_SCALE, 1.0))
     
-    # Metric 2: Chunk agreement
-    top_k = min(3, len(results))
-    avg_distance = sum(r['distance'] for r in results[:top_k]) / top_k
-    chunk_agreement = max(0, 1 - min(avg_distance / 2.5, 1.0))  # Relaxed
+    # Metric 2: Chunk agreement (mean distance of the top k)
+    with np.errstate(invalid='ignore'):
+        avg_distance = np.nansum(top, axis=1) / np.sum(~np.isnan(top), axis=1)
+    chunk_agreement = np.maximum(0, 1 - np.minimum(avg_distance / DISTANCE_SCALE, 1.0))
     
     # Metric 3: Answer quality
-    answer_quality = _score_answer_quality(answer)
+    answer_quality = score_answer_quality_batch(answers)
     
     # Weighted combination - UPDATED weights
     confidence = (
-        0.3 * retrieval_score +      # Reduced from 0.4
-        0.2 * chunk_agreement +      # Reduced from 0.3
-        0.5 * answer_quality         # INCREASED from 0.3 - answer quality matters most!
+        WEIGHTS[0] * retrieval_score +
+        WEIGHTS[1] * chunk_agreement +
+        WEIGHTS[2] * answer_quality  # Answer quality matters most!
     )
+    confidence = np.where(has_results, confidence, 0.0)
     
-    return round(confidence, 2)
+    if calibration is not None:
+        confidence = np.where(has_results, calibration.apply(confidence), 0.0)
+    return confidence
 
-def _score_answer_quality(answer: str) -> float:
+def score_answer_quality_batch(answers: Sequence[str]) -> np.ndarray:
     """
-    Simple heuristics for answer quality
-    UPDATED: More generous scoring
+    Answer-quality heuristic for many answers (feature flags, NumPy arithmetic)
+    0.7 base, +0.15 dollar amount, +0.1 number, +0.05 citation, x0.9 under
+    20 characters; "not found" answers score 0.3
     """
-    score = 0.7  # Start higher (was 1.0)
-    
-    # Penalize "not found" heavily
-    if "not found" in answer.lower() or "cannot find" in answer.lower():
-        return 0.3
-    
-    # Bonus for specific content
-    if re.search(r'\$[\d,]+', answer):  # Has dollar amounts
-        score += 0.15
-    
-    if re.search(r'\d+', answer):  # Has numbers
-        score += 0.1
+    features = np.array([
+        (
+            "not found" in lowered or "cannot find" in lowered,
+            DOLLAR_AMOUNT.search(answer) is not None,
+            NUMBER.search(answer) is not None,
+            '[Source' in answer,
+            len(answer) < 20
+        )
+        for answer, lowered in ((a, a.lower()) for a in answers)
+    ], dtype=bool).reshape(-1, 5)
+    not_found, dollars, numbers, cited, short = features.T
     
-    if '[Source' in answer:  # Has citations
-        score += 0.05
-    
-    # Penalize very short answers
-    if len(answer) < 20:
-        score *= 0.9
-    
-    return min(1.0, score)
+    score = 0.7 + 0.15 * dollars + 0.1 * numbers + 0.05 * cited
+    score = np.where(short, score * 0.9, score)
+    return np.where(not_found, 0.3, np.minimum(1.0, score))
 
-def apply_guardrails(answer: str, confidence: float) -> str:
+def _distance_matrix(distances: Sequence[Sequence[float]], k: int) -> np.ndarray:
+    """Ragged distance lists → (n, k) float array, NaN-padded"""
+    if isinstance(distances, np.ndarray) and distances.ndim == 2:
+        matrix = np.full((len(distances), k), np.nan)
+        matrix[:, :min(k, distances.shape[1])] = distances[:, :k]
+        return matrix
+    matrix = np.full((len(distances), k), np.nan)
+    for row, values in enumerate(distances):
+        values = list(values)[:k]
+        matrix[row, :len(values)] = values
+    return matrix
+
+def apply_guardrails(answer: str, confidence: float,
+                     low: float = LOW_CONFIDENCE, verify: float = VERIFY_CONFIDENCE) -> str:
     """
     Apply guardrails based on confidence threshold
     UPDATED: More reasonable thresholds
+    low / verify: Thresholds (Calibration.low / .verify once fitted)
     """
-    if confidence < 0.4:  # Was 0.5
+    if confidence < low:
         return f"⚠️ LOW CONFIDENCE ({confidence})\n\n{answer}\n\n⚠️ Please verify in original document."
-    elif confidence < 0.65:  # Was 0.7
+    elif confidence < verify:
         return f"{answer}\n\n(Confidence: {confidence} - Recommend verification)"
     else:
         return answer
@@ -79,8 +121,105 @@ def check_retrieval_quality(results: List[Dict], threshold: float = 0.85) -> boo
     
     threshold: Maximum acceptable distance (default 0.85)
     """
-    if not results:
-        return False
+    return bool(check_retrieval_quality_batch([[r['distance'] for r in results]], threshold)[0])
+
+def check_retrieval_quality_batch(distances: Sequence[Sequence[float]], threshold: float = 0.85) -> np.ndarray:
+    """
+    Pre-LLM retrieval check for many candidate sets at once
+    Returns a bool per set: best distance below threshold (False when empty)
+    Uses the minimum, not the first: hybrid (RRF) order isn't distance order
+    """
+    best = np.array([min(row, default=np.nan) for row in distances], dtype=float)
+    with np.errstate(invalid='ignore'):
+        return ~np.isnan(best) & (best < threshold)
+
+class Calibration:
+    """
+    Raw confidence → probability the answer is correct (Platt scaling),
+    plus guardrail thresholds tuned on the same labelled answers
+    """
+    
+    def __init__(self, slope: float = 1.0, intercept: float = 0.0,
+                 low: float = LOW_CONFIDENCE, verify: float = VERIFY_CONFIDENCE):
+        self.slope = slope
+        self.intercept = intercept
+        self.low = low
+        self.verify = verify
+    
+    def apply(self, scores) -> np.ndarray:
+        return 1.0 / (1.0 + np.exp(-(self.slope * np.asarray(scores, dtype=float) + self.intercept)))
     
-    # Check if best result is below threshold
-    return results[0]['distance'] < threshold
\ No newline at end of file
+    @classmethod
+    def fit(cls, scores, labels, low_precision: float = 0.5, verify_precision: float = 0.9,
+            iterations: int = 50) -> "Calibration":
+        """
+        scores: Raw confidences; labels: 1 = answer was correct
+        low_precision / verify_precision: Answers at or above `low` (`verify`)
+        are correct at least this often
+        """
+        x = np.asarray(scores, dtype=float)
+        y = np.asarray(labels, dtype=float)
+        if x.size == 0 or y.min() == y.max():
+            raise ValueError("Calibration needs both correct and incorrect examples")
+        
+        # Logistic regression on one feature: Newton steps (IRLS)
+        X = np.column_stack([x, np.ones_like(x)])
+        w = np.zeros(2)
+        for _ in range(iterations):
+            p = 1.0 / (1.0 + np.exp(-X @ w))
+            gradient = X.T @ (y - p)
+            hessian = (X * (p * (1 - p))[:, None]).T @ X + 1e-6 * np.eye(2)
+            step = np.linalg.solve(hessian, gradient)
+            w += step
+            if np.abs(step).max() < 1e-8:
+                break
+        
+        calibration = cls(slope=float(w[0]), intercept=float(w[1]))
+        probabilities = calibration.apply(x)
+        calibration.low = _precision_threshold(probabilities, y, low_precision, LOW_CONFIDENCE)
+        calibration.verify = max(
+            calibration.low,
+            _precision_threshold(probabilities, y, verify_precision, VERIFY_CONFIDENCE)
+        )
+        return calibration
+    
+    def to_dict(self) -> Dict:
+        return {'slope': self.slope, 'intercept': self.intercept, 'low': self.low, 'verify': self.verify}
+    
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+    
+    @classmethod
+    def load(cls, path: str) -> "Calibration":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+def _precision_threshold(scores: np.ndarray, labels: np.ndarray, precision: float,
+                         default: float) -> float:
+    """Lowest score t such that answers scoring >= t are correct at least `precision` of the time"""
+    order = np.argsort(-scores, kind='stable')
+    sorted_scores, sorted_labels = scores[order], labels[order]
+    # Precision of the top-n answers, evaluated only where the score changes
+    precisions = np.cumsum(sorted_labels) / np.arange(1, len(sorted_labels) + 1)
+    last_of_tie = np.r_[sorted_scores[1:] != sorted_scores[:-1], True]
+    ok = np.nonzero(last_of_tie & (precisions >= precision))[0]
+    if ok.size == 0:
+        return default
+    return round(float(sorted_scores[ok[-1]]), 4)
+
+def load_labelled(path: str) -> Tuple[List[List[float]], List[str], List[int]]:
+    """
+    Labelled evaluation file (JSONL): one answer per line with "distances"
+    (best first), "answer" and "correct" (true/false; may be absent for logs)
+    """
+    distances, answers, labels = [], [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            distances.append(record.get('distances') or [])
+            answers.append(record.get('answer') or "")
+            labels.append(int(bool(record.get('correct'))))
+    return distances, answers, labels
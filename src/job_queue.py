@@ -0,0 +1,182 @@
+"""
+Ingestion Jobs: SQLite job table + bounded async worker pool
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class JobStore:
+    def __init__(self, db_path: str = "./data/jobs.db"):
+        """Persist ingestion jobs in a local SQLite table"""
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    file_path TEXT,
+                    file_hash TEXT,
+                    options TEXT,
+                    status TEXT,
+                    stage TEXT,
+                    stages TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL,
+                    updated_at REAL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_hash ON jobs (file_hash, status)"
+            )
+
+    def create(self, filename: str, file_path: str, file_hash: str,
+               options: Dict = None) -> Dict:
+        """Insert a new queued job"""
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, 'queued', 'queued', '[]', NULL, NULL, ?, ?)",
+                (job_id, filename, file_path, file_hash, json.dumps(options or {}), now, now)
+            )
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields) -> None:
+        """Update columns; dict/list values are stored as JSON"""
+        fields['updated_at'] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        values = [
+            json.dumps(v) if isinstance(v, (dict, list)) else v
+            for v in fields.values()
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*values, job_id))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def find_active(self, file_hash: str, options: Dict = None) -> Optional[Dict]:
+        """Queued/running job for the same bytes + options (retry of an in-flight upload)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE file_hash = ? AND options = ? "
+                "AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (file_hash, json.dumps(options or {}), *ACTIVE_STATUSES)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self) -> List[Dict]:
+        """Jobs interrupted by a restart, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                ACTIVE_STATUSES
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        for key in ('options', 'stages', 'result'):
+            job[key] = json.loads(job[key]) if job[key] else None
+        return job
+
+
+class IngestionQueue:
+    def __init__(self,
+                 store: JobStore,
+                 handler: Callable[[Dict, Callable], Awaitable[Dict]],
+                 workers: int = 2):
+        """
+        Bounded worker pool over an in-memory queue of job ids
+
+        handler(job, stage) runs the pipeline; `stage(name)` is an async
+        context manager that records the current stage and its timing.
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start workers and re-enqueue jobs left over from a previous run"""
+        for job in self.store.unfinished():
+            self.store.update(job['id'], status='queued', stage='queued')
+            self._queue.put_nowait(job['id'])
+
+        self._tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        print(f"🧵 Ingestion queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, filename: str, file_path: str, file_hash: str,
+               options: Dict = None) -> Dict:
+        """Create and enqueue a job; returns the in-flight job for a duplicate upload"""
+        existing = self.store.find_active(file_hash, options)
+        if existing:
+            print(f"♻️ Upload matches in-flight job {existing['id']}")
+            return existing
+
+        job = self.store.create(filename, file_path, file_hash, options)
+        self._queue.put_nowait(job['id'])
+        return job
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        return self._queue.qsize()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        stages = []
+
+        @asynccontextmanager
+        async def stage(name: str):
+            self.store.update(job_id, stage=name)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                stages.append({'stage': name, 'seconds': round(time.perf_counter() - start, 3)})
+                self.store.update(job_id, stages=stages)
+
+        self.store.update(job_id, status='running', stages=stages)
+        try:
+            result = await self.handler(job, stage)
+            self.store.update(job_id, status='succeeded', stage='done', result=result)
+        except Exception as e:
+            print(f"\n❌ Job {job_id} failed: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            self.store.update(job_id, status='failed', error=f"{type(e).__name__}: {e}")
@@ -0,0 +1,218 @@
+"""
+Lexical Index: Incremental BM25 inverted index persisted in SQLite
+Catches exact tokens dense embeddings miss (load ids, amounts, SCAC codes)
+"""
+import json
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.,][0-9]+)*")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how',
+    'in', 'is', 'it', 'of', 'on', 'or', 'the', 'this', 'to', 'was', 'what',
+    'when', 'where', 'which', 'who', 'with'
+}
+
+# Filter keys stored as columns (pushed into SQL); others are checked in Python
+INDEXED_KEYS = ('reference_id', 'doc_type', 'tenant_id')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word/number tokens
+    "$1,000.00" → ["1000.00", "1000"], "LD53657" → ["ld53657"]
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token[0].isdigit():
+            token = token.replace(',', '')
+            if '.' in token:
+                tokens.append(token.split('.')[0])
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, db_path: str = "./data/bm25_index.db", k1: float = 1.5, b: float = 0.75):
+        """
+        BM25 over chunk text; updated incrementally alongside Chroma
+        Document frequencies and corpus stats live in SQLite too, so every
+        process sharing db_path (API workers, ingest.py) scores alike
+        """
+        self.k1 = k1
+        self.b = b
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            tables = {row[0] for row in self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )}
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    id TEXT PRIMARY KEY,
+                    reference_id TEXT,
+                    doc_type TEXT,
+                    length INTEGER,
+                    metadata TEXT,
+                    tenant_id TEXT
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(docs)")}
+            if 'tenant_id' not in columns:  # Index built before tenants were a column
+                self._conn.execute("ALTER TABLE docs ADD COLUMN tenant_id TEXT")
+                self._conn.execute("UPDATE docs SET tenant_id = json_extract(metadata, '$.tenant_id')")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT,
+                    doc_id TEXT,
+                    tf INTEGER,
+                    PRIMARY KEY (term, doc_id)
+                )
+            """)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER)"
+            )
+            if 'terms' not in tables:
+                self._conn.execute(
+                    "INSERT INTO terms SELECT term, COUNT(*) FROM postings GROUP BY term"
+                )
+            if 'stats' not in tables:
+                self._conn.execute(
+                    "INSERT INTO stats SELECT 'docs', COUNT(*) FROM docs "
+                    "UNION ALL SELECT 'length', COALESCE(SUM(length), 0) FROM docs"
+                )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id)")
+            self._conn.execute("DROP INDEX IF EXISTS idx_docs_ref")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_docs_ref_tenant ON docs (reference_id, tenant_id)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stats()[0]
+
+    def _stats(self) -> Tuple[int, int]:
+        """(documents, total length) - lock held"""
+        stats = dict(self._conn.execute("SELECT key, value FROM stats").fetchall())
+        return stats.get('docs', 0), stats.get('length', 0)
+
+    def add(self, ids: List[str], texts: List[str], metadatas: List[Dict]) -> None:
+        """Index (or re-index) documents"""
+        with self._lock, self._conn:
+            self._delete(ids)
+            total = 0
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                self._conn.execute(
+                    "INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?)",
+                    (doc_id, metadata.get('reference_id'), metadata.get('doc_type'),
+                     length, json.dumps(metadata), metadata.get('tenant_id'))
+                )
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    [(term, doc_id, tf) for term, tf in counts.items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO terms VALUES (?, 1) "
+                    "ON CONFLICT (term) DO UPDATE SET df = df + 1",
+                    [(term, ) for term in counts]
+                )
+                total += length
+            self._update_stats(len(ids), total)
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock, self._conn:
+            self._delete(ids)
+
+    def _delete(self, ids: List[str]) -> None:
+        """Remove documents (lock + transaction held)"""
+        n_docs = total = 0
+        for doc_id in ids:
+            row = self._conn.execute("SELECT length FROM docs WHERE id = ?", (doc_id,)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute(
+                "UPDATE terms SET df = df - 1 "
+                "WHERE term IN (SELECT term FROM postings WHERE doc_id = ?)", (doc_id,)
+            )
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+            n_docs -= 1
+            total -= row[0]
+        if n_docs:
+            self._update_stats(n_docs, total)
+
+    def _update_stats(self, n_docs: int, total_length: int) -> None:
+        self._conn.executemany(
+            "INSERT INTO stats VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+            [('docs', n_docs), ('length', total_length)]
+        )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+            self._conn.execute("DELETE FROM terms")
+            self._conn.execute("UPDATE stats SET value = 0")
+
+    def search(self, query: str, n_results: int = 10,
+               filter_dict: Optional[Dict] = None) -> List[Tuple[str, float]]:
+        """Top (doc_id, bm25_score) pairs matching filter_dict (equality)"""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+
+        filter_dict = {k: v for k, v in (filter_dict or {}).items() if v is not None}
+        sql_filters = {k: str(v) for k, v in filter_dict.items() if k in INDEXED_KEYS}
+        py_filters = {k: str(v) for k, v in filter_dict.items() if k not in INDEXED_KEYS}
+        where = "".join(f" AND d.{k} = ?" for k in sql_filters)
+        placeholders = ", ".join("?" * len(terms))
+
+        if 'reference_id' in sql_filters:
+            # A load has few chunks: walk them, probing postings by primary key
+            sql = (f"SELECT p.term, p.doc_id, p.tf, d.length, d.metadata FROM docs d "
+                   f"CROSS JOIN postings p ON p.term IN ({placeholders}) AND p.doc_id = d.id "
+                   f"WHERE 1{where}")
+        else:
+            # Otherwise the query terms' postings, filtered on the docs' columns
+            sql = (f"SELECT p.term, p.doc_id, p.tf, d.length, d.metadata FROM postings p "
+                   f"CROSS JOIN docs d ON d.id = p.doc_id WHERE p.term IN ({placeholders}){where}")
+
+        with self._lock:
+            n_docs, total_length = self._stats()
+            if not n_docs:
+                return []
+            dfs = dict(self._conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({placeholders}) AND df > 0", terms
+            ).fetchall())
+            if not dfs:
+                return []
+            rows = self._conn.execute(sql, (*terms, *sql_filters.values())).fetchall()
+
+        avg_length = total_length / n_docs
+        idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in dfs.items()
+        }
+        scores = defaultdict(float)
+        for term, doc_id, tf, length, metadata in rows:
+            if py_filters:
+                metadata = json.loads(metadata)
+                if any(metadata.get(k) != v for k, v in py_filters.items()):
+                    continue
+            norm = self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[doc_id] += idf.get(term, 0.0) * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:n_results]
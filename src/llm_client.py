@@ -0,0 +1,150 @@
+"""
+LLM Client: One pooled OpenAI transport shared by every component
+Bounded keep-alive pool (HTTP/2 when h2 is installed), per-endpoint timeouts,
+SDK retries with jittered backoff and a shared in-flight limit
+"""
+import asyncio
+import importlib.util
+import time
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from .metrics import REGISTRY
+
+QUEUE_SECONDS = REGISTRY.histogram(
+    "udi_llm_queue_seconds", "Time an LLM call waited for a concurrency slot", ("client",)
+)
+
+
+class _LimitedCompletions:
+    """chat.completions whose calls hold a slot of the shared semaphore"""
+
+    def __init__(self, completions, factory: "OpenAIClientFactory", name: str):
+        self._completions = completions
+        self._factory = factory
+        self._name = name
+
+    async def create(self, **kwargs):
+        await self._factory._acquire(self._name)
+        try:
+            response = await self._completions.create(**kwargs)
+        except BaseException:
+            self._factory._release()
+            raise
+
+        if not kwargs.get('stream'):
+            self._factory._release()
+            return response
+        return self._hold(response)
+
+    async def _hold(self, stream) -> AsyncIterator:
+        """Streams keep their slot until fully read (or closed)"""
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            # A client that disconnects mid-answer must not leave the HTTP
+            # response open (its connection would never return to the pool)
+            try:
+                close = getattr(stream, 'close', None) or getattr(stream, 'aclose', None)
+                if close is not None:
+                    await close()
+            finally:
+                self._factory._release()
+
+
+class LimitedClient:
+    """AsyncOpenAI view: chat.completions is rate limited, `raw` is the SDK client"""
+
+    def __init__(self, raw: AsyncOpenAI, factory: "OpenAIClientFactory", name: str):
+        self.raw = raw
+        self.chat = SimpleNamespace(completions=_LimitedCompletions(raw.chat.completions, factory, name))
+
+
+class OpenAIClientFactory:
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: Optional[str] = None,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 http2: bool = True,
+                 connect_timeout: float = 5.0,
+                 timeout: float = 60.0,
+                 max_retries: int = 2,
+                 max_concurrency: int = 32,
+                 http_client: Optional[httpx.AsyncClient] = None):
+        """
+        base_url: OpenAI-compatible endpoint (e.g. a local mock server);
+        None = OPENAI_BASE_URL or api.openai.com
+        max_connections / max_keepalive_connections / keepalive_expiry: Pool bounds
+        http2: Multiplex requests over one connection (needs the h2 package)
+        connect_timeout / timeout: Defaults; client(timeout=...) overrides per endpoint
+        max_retries: SDK retries on 408/409/429/5xx and connection errors
+        (exponential backoff with jitter, honours Retry-After)
+        max_concurrency: LLM calls in flight at once across all clients
+        http_client: Use this transport instead (tests / mock transports)
+        """
+        if http2 and http_client is None and importlib.util.find_spec("h2") is None:
+            print("⚠️ h2 not installed, OpenAI client falls back to HTTP/1.1")
+            http2 = False
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.http_client = http_client or DefaultAsyncHttpxClient(
+            http2=http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    def client(self, timeout: Optional[float] = None, name: str = "default") -> LimitedClient:
+        """
+        Client sharing the pool and the concurrency limit
+        timeout: Read timeout for this endpoint (connect timeout stays shared)
+        name: Label for queue-time metrics
+        """
+        raw = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout if timeout is None else httpx.Timeout(timeout, connect=self.timeout.connect),
+            max_retries=self.max_retries,
+            http_client=self.http_client
+        )
+        return LimitedClient(raw, self, name)
+
+    async def _acquire(self, name: str) -> None:
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        QUEUE_SECONDS.observe(time.perf_counter() - start, client=name)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_concurrency': self.max_concurrency
+        }
@@ -0,0 +1,137 @@
+"""
+Load Records: Latest structured extraction per load (per-doc-type + merged)
+Persisted in SQLite; every ingest bumps the load's generation so records
+extracted before it read as stale (also across restarts and ingest.py runs)
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+
+class LoadRecords:
+    def __init__(self, db_path: str = ":memory:"):
+        """db_path: SQLite file shared by the API and ingest.py (":memory:" = per process)"""
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS generations (
+                    reference_id TEXT PRIMARY KEY,
+                    generation INTEGER
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    reference_id TEXT,
+                    tenant_id TEXT,
+                    generation INTEGER,
+                    by_doc_type TEXT,
+                    merged TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (reference_id, tenant_id)
+                )
+            """)
+
+    def generation(self, reference_id: str) -> int:
+        """Read BEFORE fetching chunks; pass the value to put()"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT generation FROM generations WHERE reference_id = ?", (reference_id,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def invalidate(self, reference_ids: Iterable[str]) -> None:
+        """New chunks were stored for these loads (call after the store)"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO generations VALUES (?, 1) "
+                "ON CONFLICT (reference_id) DO UPDATE SET generation = generation + 1",
+                [(r, ) for r in set(reference_ids) if r]
+            )
+
+    def put(self, reference_id: str, record: Dict, generation: int,
+            tenant_id: Optional[str] = None) -> None:
+        """record: {'by_doc_type', 'merged'} from StructuredExtractor.extract_record"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)",
+                (reference_id, tenant_id or "", generation,
+                 json.dumps(record['by_doc_type']), json.dumps(record['merged']), time.time())
+            )
+
+    def get(self, reference_id: str, tenant_id: Optional[str] = None) -> Optional[Dict]:
+        """The record, unless documents were stored for the load since it was extracted"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.by_doc_type, r.merged, r.generation, r.updated_at FROM records r "
+                "LEFT JOIN generations g ON g.reference_id = r.reference_id "
+                "WHERE r.reference_id = ? AND r.tenant_id = ? "
+                "AND r.generation = COALESCE(g.generation, 0)",
+                (reference_id, tenant_id or "")
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'by_doc_type': json.loads(row[0]),
+            'merged': json.loads(row[1]),
+            'generation': row[2],
+            'updated_at': row[3]
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+
+class RecordRefresher:
+    """
+    Background re-extraction after ingest, one run per load at a time
+    Documents arriving during a run (or within `delay`) trigger one more run
+    """
+
+    def __init__(self, refresh: Callable[[str, Optional[str]], Awaitable[bool]], delay: float = 2.0):
+        """
+        refresh: (reference_id, tenant_id) → True once the stored record is current
+        delay: Seconds to wait for the rest of a load's documents before extracting
+        """
+        self._refresh = refresh
+        self.delay = delay
+        self._tasks: Dict[Tuple, asyncio.Task] = {}
+        self._dirty = set()
+
+    def schedule(self, reference_id: str, tenant_id: Optional[str] = None) -> None:
+        key = (reference_id, tenant_id)
+        if key in self._tasks:
+            self._dirty.add(key)
+            return
+        self._tasks[key] = asyncio.create_task(self._run(key))
+
+    async def _run(self, key: Tuple) -> None:
+        try:
+            while True:
+                self._dirty.discard(key)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                try:
+                    current = await self._refresh(*key)
+                except Exception as e:
+                    print(f"⚠️ Record refresh failed for {key[0]}: {type(e).__name__}: {e}")
+                    return
+                if current and key not in self._dirty:
+                    print(f"✅ Extraction record ready: {key[0]}")
+                    return
+        finally:
+            self._tasks.pop(key, None)
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,193 @@
+"""
+Metrics: Timing spans + counters rendered in Prometheus text format
+Process-wide registry (like prometheus_client) so any module can record
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0
+                }
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self) -> Dict[Tuple, Dict]:
+        """{label values: {'count', 'sum'}}"""
+        with self._lock:
+            return {
+                key: {'count': series['count'], 'sum': series['sum']}
+                for key, series in self._series.items()
+            }
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series['counts']):
+                    cumulative += count
+                    le = _labels(self.label_names, key, f'le="{_number(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _labels(self.label_names, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {series['count']}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            return self._values.get(key, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class Collector:
+    """Values read at scrape time (cache stats, collection size, ...)"""
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Tuple[str, ...],
+                 collect: Callable[[], Dict[Tuple, float]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"⚠️ Metrics collector {self.name} failed: {type(e).__name__}: {e}")
+            return lines
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, key)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def histogram(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, label_names, buckets))
+
+    def counter(self, name: str, help: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, label_names))
+
+    def collector(self, name: str, help: str, collect: Callable[[], Dict[Tuple, float]],
+                  label_names: Tuple[str, ...] = (), kind: str = "gauge") -> Collector:
+        """Register (or replace) a scrape-time metric"""
+        collector = Collector(name, help, kind, label_names, collect)
+        with self._lock:
+            self._metrics[name] = collector
+        return collector
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "udi_stage_seconds",
+    "Pipeline stage latency (parse, chunk, embed, store, retrieve, diversify, "
+    "generate, confidence, extract)",
+    ("stage",)
+)
+LLM_TOKENS = REGISTRY.counter(
+    "udi_llm_tokens_total", "OpenAI tokens used", ("model", "kind")
+)
+LLM_CALLS = REGISTRY.counter(
+    "udi_llm_calls_total", "OpenAI chat completion calls", ("model",)
+)
+LLM_CALLS_SAVED = REGISTRY.counter(
+    "udi_llm_calls_saved_total", "Questions answered without an LLM call", ("reason",)
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time a block into udi_stage_seconds{stage=...} (works inside async code)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_usage(model: str, usage: Optional[object]) -> None:
+    """Count one completion call and its token usage (if the response has any)"""
+    LLM_CALLS.inc(model=model)
+    if usage is None:
+        return
+    LLM_TOKENS.inc(getattr(usage, 'prompt_tokens', 0) or 0, model=model, kind="prompt")
+    LLM_TOKENS.inc(getattr(usage, 'completion_tokens', 0) or 0, model=model, kind="completion")
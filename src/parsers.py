@@ -0,0 +1,237 @@
+"""
+Parsers: PDF → Markdown backends for DocumentProcessor
+Every backend exposes `name`, `settings()` (part of the parse cache key)
+and `async aparse(file_path) -> markdown`
+"""
+import asyncio
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from llama_parse import LlamaParse
+
+# Bump when the local markdown layout changes so cached parses are not reused
+LOCAL_PARSER_VERSION = 1
+
+# Short lines treated as section titles even without a larger/bold font
+SECTION_HEADINGS = {
+    'pickup', 'pickup details', 'pickup information', 'delivery', 'delivery details',
+    'delivery information', 'stops', 'stop 1', 'stop 2', 'rate breakdown', 'rates',
+    'carrier details', 'customer details', 'shipper', 'consignee', 'driver details',
+    'commodity', 'commodity details', 'special instructions', 'instructions',
+    'notes', 'terms and conditions'
+}
+
+PARSING_INSTRUCTION = """
+            This is a logistics document. Preserve all tables.
+            Maintain headers for sections like Pickup, Delivery, Rate Breakdown.
+            """
+
+
+class LlamaParseParser:
+    """Remote LlamaParse (default)"""
+    name = "llamaparse"
+
+    def __init__(self, api_key: str,
+                 result_type: str = "markdown",
+                 parsing_instruction: str = PARSING_INSTRUCTION):
+        self.result_type = result_type
+        self.parsing_instruction = parsing_instruction
+        self.client = LlamaParse(
+            api_key=api_key,
+            result_type=result_type,
+            parsing_instruction=parsing_instruction
+        )
+
+    def settings(self) -> Dict:
+        return {
+            'result_type': self.result_type,
+            'parsing_instruction': self.parsing_instruction
+        }
+
+    async def aparse(self, file_path: str) -> str:
+        documents = await self.client.aload_data(file_path)
+        return documents[0].text
+
+
+class MarkdownFileParser:
+    """
+    Offline stand-in: reads pre-rendered markdown instead of parsing the PDF
+    Uses `<name>.md` next to `<name>.pdf`, or the file itself when it is .md
+    """
+    name = "markdown"
+
+    def settings(self) -> Dict:
+        return {'parser': self.name}
+
+    @staticmethod
+    def markdown_path(file_path: str) -> str:
+        if file_path.lower().endswith(".md"):
+            return file_path
+        return os.path.splitext(file_path)[0] + ".md"
+
+    def parse(self, file_path: str) -> str:
+        with open(self.markdown_path(file_path), encoding="utf-8") as f:
+            return f.read()
+
+    async def aparse(self, file_path: str) -> str:
+        return await asyncio.to_thread(self.parse, file_path)
+
+
+def _table_markdown(rows: List[List[Optional[str]]]) -> str:
+    """pdfplumber table rows → markdown table (first row is the header)"""
+    rows = [
+        [" ".join((cell or "").split()).replace("|", "/") for cell in row]
+        for row in rows if any(cell for cell in row)
+    ]
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    lines = ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+    lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+    return "\n".join(lines)
+
+
+def _is_heading(text: str, chars: List[Dict], body_size: float) -> bool:
+    """Larger-than-body, all-bold, or a known section title - and short"""
+    if len(text) > 60 or text.startswith("|"):
+        return False
+    if text.lower().rstrip(":") in SECTION_HEADINGS:
+        return True
+    if not chars:
+        return False
+    size = max(c.get('size', 0) for c in chars)
+    if size >= body_size * 1.15:
+        return True
+    bold = all('bold' in c.get('fontname', '').lower() for c in chars if c.get('text', '').strip())
+    label = ':' in text.rstrip(':')  # "Reference ID: LD53657" is a field, not a title
+    return bold and not label
+
+
+def parse_pdf_locally(file_path: str, min_chars_per_page: float = 0) -> Tuple[Optional[str], float]:
+    """
+    Text-layer PDF → ##-sectioned markdown with markdown tables
+    Returns (None, chars_per_page) when the text layer is too thin (scans)
+    """
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        pages = pdf.pages
+        chars_per_page = sum(len(page.chars) for page in pages) / max(len(pages), 1)
+        if chars_per_page < min_chars_per_page:
+            return None, chars_per_page
+
+        # Most common font size is body text
+        sizes = Counter(round(c['size'], 1) for page in pages for c in page.chars)
+        body_size = sizes.most_common(1)[0][0] if sizes else 10.0
+
+        parts = []
+        titled = False
+        for page in pages:
+            tables = page.find_tables()
+            boxes = [table.bbox for table in tables]
+            blocks = [(table.bbox[1], _table_markdown(table.extract())) for table in tables]
+
+            def outside_tables(obj) -> bool:
+                x, y = (obj['x0'] + obj['x1']) / 2, (obj['top'] + obj['bottom']) / 2
+                return not any(x0 <= x <= x1 and top <= y <= bottom for x0, top, x1, bottom in boxes)
+
+            text_page = page.filter(outside_tables) if boxes else page
+            for line in text_page.extract_text_lines(return_chars=True):
+                text = line['text'].strip()
+                if not text:
+                    continue
+                if _is_heading(text, line.get('chars', []), body_size):
+                    # First non-section heading is the document title
+                    section = titled or text.lower().rstrip(':') in SECTION_HEADINGS
+                    text = f"{'##' if section else '#'} {text.rstrip(':')}"
+                    titled = True
+                blocks.append((line['top'], text))
+
+            # Interleave text and tables in reading order
+            parts.extend(block for _, block in sorted(blocks, key=lambda b: b[0]) if block)
+
+    return "\n\n".join(parts), chars_per_page
+
+
+class LocalPDFParser:
+    """
+    In-process pdfplumber extraction (milliseconds, no network)
+    Only for PDFs with a text layer - see AutoParser for scans
+    """
+    name = "local"
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        workers: CPU processes for parsing (default: CPUs);
+        0 parses on a thread (e.g. when already inside a worker process)
+        """
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def settings(self) -> Dict:
+        return {'parser': self.name, 'version': LOCAL_PARSER_VERSION}
+
+    async def arun(self, file_path: str, min_chars_per_page: float = 0) -> Tuple[Optional[str], float]:
+        """parse_pdf_locally on the CPU pool"""
+        if self.workers == 0:
+            return await asyncio.to_thread(parse_pdf_locally, file_path, min_chars_per_page)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers or os.cpu_count() or 1)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, parse_pdf_locally, file_path, min_chars_per_page)
+
+    async def aparse(self, file_path: str) -> str:
+        markdown, _ = await self.arun(file_path)
+        return markdown
+
+
+class AutoParser:
+    """
+    Local parser first; LlamaParse only for scanned / low-text PDFs
+    Text density (characters per page) is checked before any layout work
+    """
+    name = "auto"
+
+    def __init__(self, local: LocalPDFParser, fallback, min_chars_per_page: float = 200):
+        self.local = local
+        self.fallback = fallback
+        self.min_chars_per_page = min_chars_per_page
+
+    def settings(self) -> Dict:
+        return {
+            'parser': self.name,
+            'local': self.local.settings(),
+            'fallback': self.fallback.settings(),
+            'min_chars_per_page': self.min_chars_per_page
+        }
+
+    async def aparse(self, file_path: str) -> str:
+        try:
+            markdown, chars_per_page = await self.local.arun(file_path, self.min_chars_per_page)
+        except Exception as e:  # Missing pdfplumber, malformed PDF, ...
+            print(f"⚠️ Local parse failed ({type(e).__name__}: {e}) - using {self.fallback.name}")
+            return await self.fallback.aparse(file_path)
+
+        if not markdown or not markdown.strip():
+            print(f"📠 Low text density ({chars_per_page:.0f} chars/page) - using {self.fallback.name}")
+            return await self.fallback.aparse(file_path)
+
+        print(f"⚡ Parsed locally ({chars_per_page:.0f} chars/page)")
+        return markdown
+
+
+def make_parser(name: str, api_key: str = None, workers: Optional[int] = None,
+                min_chars_per_page: float = 200):
+    """Parser backend by name ("llamaparse", "local", "auto" or "markdown")"""
+    if name == LlamaParseParser.name:
+        return LlamaParseParser(api_key)
+    if name == LocalPDFParser.name:
+        return LocalPDFParser(workers)
+    if name == AutoParser.name:
+        return AutoParser(LocalPDFParser(workers), LlamaParseParser(api_key), min_chars_per_page)
+    if name == MarkdownFileParser.name:
+        return MarkdownFileParser()
+    raise ValueError(f"Unknown parser: {name}")
@@ -0,0 +1,93 @@
+"""
+Prompt Budget: Fit retrieved context into a token budget before an LLM call
+Drops repeated parent headers (re-attached to every section chunk),
+then truncates / drops the lowest-ranked texts
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import REGISTRY
+from .utils import count_tokens
+
+TOKENS_SAVED = REGISTRY.counter(
+    "udi_prompt_tokens_saved_total", "Context tokens removed by the prompt budget", ("component",)
+)
+
+
+class PromptBudget:
+    def __init__(self, max_tokens: int = 3000, min_chunk_tokens: int = 50, name: str = "prompt"):
+        """
+        max_tokens: Budget for the whole prompt (template + context)
+        min_chunk_tokens: Don't keep a truncated text shorter than this
+        name: Label for logs / metrics
+        """
+        self.max_tokens = max_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+        self.name = name
+
+    def fit(self, texts: List[str], reserved_tokens: int = 0,
+            headers: Optional[List[Optional[str]]] = None) -> Tuple[List[str], Dict]:
+        """
+        texts: Context pieces, most important first
+        reserved_tokens: Tokens the rest of the prompt already uses
+        headers: Parent header each text starts with (aligned, None = no header);
+        only these are deduplicated, text bodies are never compared
+
+        Returns the texts aligned with the input ("" where a text was dropped,
+        prefix where truncated) and a report with token counts before and after
+        """
+        before = sum(count_tokens(t) for t in texts)
+        budget = max(self.max_tokens - reserved_tokens, 0)
+        headers = headers or [None] * len(texts)
+
+        seen = set()
+        kept, remaining = [], budget
+        duplicates = truncated = dropped = 0
+
+        for text, header in zip(texts, headers):
+            # A header already kept with a higher-ranked text adds nothing
+            if header in seen and text.startswith(header):
+                text = text[len(header):].lstrip("\n")
+                duplicates += 1
+                header = None
+
+            tokens = count_tokens(text)
+            if tokens <= remaining:
+                kept.append(text)
+                remaining -= tokens
+            elif remaining >= self.min_chunk_tokens:
+                kept.append(self._truncate(text, remaining))
+                truncated += 1
+                remaining = 0
+            else:
+                kept.append("")
+                dropped += 1
+            if header and kept[-1].startswith(header):
+                seen.add(header)
+
+        after = sum(count_tokens(t) for t in kept)
+        report = {
+            'tokens_before': before,
+            'tokens_after': after,
+            'tokens_saved': before - after,
+            'repeated_headers': duplicates,
+            'truncated': truncated,
+            'dropped': dropped,
+            'budget': budget
+        }
+        if report['tokens_saved']:
+            TOKENS_SAVED.inc(report['tokens_saved'], component=self.name)
+            print(f"✂️ {self.name} budget: {before} → {after} context tokens "
+                  f"({duplicates} repeated headers, {truncated} truncated, {dropped} dropped)")
+        return kept, report
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        """Longest prefix of whole lines within max_tokens"""
+        lines, used = [], 0
+        for line in text.split("\n"):
+            tokens = count_tokens(line + "\n")
+            if used + tokens > max_tokens:
+                break
+            lines.append(line)
+            used += tokens
+        return "\n".join(lines)
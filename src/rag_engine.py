@@ -1,33 +1,172 @@
 """
 RAG Engine: Retrieve + Generate answers
 """
-from openai import OpenAI
-from typing import List, Dict, Tuple
+from openai import AsyncOpenAI
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from .answer_cache import AnswerCache, normalize_question
 from .vector_store import VectorStore
-from .guardrails import calculate_confidence, apply_guardrails
+from .guardrails import LOW_CONFIDENCE, Calibration, calculate_confidence, apply_guardrails
+from .metrics import record_usage, span
+from .prompt_budget import PromptBudget
+from .retrieval_gate import RetrievalGate
+from .field_answers import answer_from_record
+from .load_records import LoadRecords
+from .single_flight import SingleFlight
+from .utils import count_tokens
+
+ANSWER_MODEL = "gpt-4o-mini"
 
 class RAGEngine:
-    def __init__(self, api_key: str, vector_store: VectorStore):
-        """Initialize with OpenAI and vector store"""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self,
+                 api_key: str,
+                 vector_store: VectorStore,
+                 answer_cache: Optional[AnswerCache] = None,
+                 retrieval_mode: str = "vector",
+                 n_candidates: int = 15,
+                 coalesce: bool = True,
+                 prompt_budget: Optional[PromptBudget] = None,
+                 client: Optional[AsyncOpenAI] = None,
+                 calibration: Optional[Calibration] = None,
+                 gate: Optional[RetrievalGate] = None,
+                 load_records: Optional[LoadRecords] = None):
+        """
+        Initialize with OpenAI and vector store
+        answer_cache: Optional semantic cache consulted before retrieval
+        retrieval_mode: "vector" (Chroma only) or "hybrid" (BM25 + vector, RRF)
+        n_candidates: Results retrieved before diversity selection
+        coalesce: Concurrent identical questions share one retrieval + LLM call
+        prompt_budget: Optional token budget for the context sent to the LLM
+        client: OpenAI client to use (e.g. from OpenAIClientFactory);
+        default: a private AsyncOpenAI(api_key)
+        calibration: Fitted confidence calibration + thresholds (see calibrate.py)
+        gate: Optional pre-LLM retrieval gate (reject / extractive answer
+        without a generation call)
+        load_records: Extraction records per load; single-field questions
+        about a load with a current record are answered from it directly
+        """
+        self.client = client or AsyncOpenAI(api_key=api_key)
         self.vector_store = vector_store
+        self.answer_cache = answer_cache
+        self.retrieval_mode = retrieval_mode
+        self.n_candidates = n_candidates
+        self._flights = SingleFlight("ask") if coalesce else None
+        self.prompt_budget = prompt_budget
+        self.calibration = calibration
+        self.gate = gate
+        self.load_records = load_records
     
-    def ask(self, question: str, reference_id: str = None) -> Dict:
+    async def ask(self, question: str, reference_id: str = None, tenant_id: str = None) -> Dict:
         """
         Main method: Question → Answer with confidence
+        tenant_id: Restrict retrieval to one tenant (routes to its shard)
+        """
+        if self._flights is None:
+            return await self._ask(question, reference_id, tenant_id)
+        
+        key = (reference_id, tenant_id, normalize_question(question))
+        return await self._flights.do(key, lambda: self._ask(question, reference_id, tenant_id))
+    
+    async def _ask(self, question: str, reference_id: str = None, tenant_id: str = None) -> Dict:
+        state = await self._retrieve(question, reference_id, tenant_id)
+        if state['result'] is not None:
+            return state['result']
+        
+        # Generate answer (parent headers re-attached only for the prompt)
+        answer, _ = await self._generate_answer(question, await self._context(state))
+        
+        return self._finalize(state, question, answer)
+    
+    async def ask_stream(self, question: str, reference_id: str = None,
+                         tenant_id: str = None) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of ask
+        Yields {'event', 'data'}: 'sources' first, then 'token' deltas,
+        then 'done' with the same payload ask() returns
+        """
+        state = await self._retrieve(question, reference_id, tenant_id)
+        
+        if state['result'] is not None:
+            # Cache hit / not found: nothing to generate
+            yield {'event': 'sources', 'data': state['result']['sources']}
+            yield {'event': 'done', 'data': state['result']}
+            return
+        
+        yield {'event': 'sources', 'data': self._format_sources(state['results'])}
+        
+        prompt, _ = self._build_prompt(question, await self._context(state))
+        parts = []
+        usage = None
+        with span("generate"):
+            stream = await self.client.chat.completions.create(
+                **self._completion_args(prompt),
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                usage = getattr(chunk, 'usage', None) or usage  # Sent on the last chunk
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield {'event': 'token', 'data': delta}
+        record_usage(ANSWER_MODEL, usage)
+        
+        yield {'event': 'done', 'data': self._finalize(state, question, "".join(parts))}
+    
+    async def _retrieve(self, question: str, reference_id: str = None,
+                        tenant_id: str = None) -> Dict:
+        """
+        Filter → cache lookup → retrieve → diversify
+        state['result'] is set when the request is answered without the LLM
         """
         # Build smart filter
-        filter_dict = self._build_filter(question, reference_id)
+        filter_dict = self._build_filter(question, reference_id, tenant_id)
+        state = {
+            'reference_id': reference_id,
+            'filter_dict': filter_dict,
+            'query_embedding': None,
+            'version': None,
+            'results': [],
+            'context': None,
+            'result': None
+        }
+        
+        # Fast path: "What is the carrier rate?" on an already extracted load
+        if reference_id and self.load_records is not None:
+            record = self.load_records.get(reference_id, tenant_id)
+            if record is not None:
+                state['result'] = answer_from_record(question, record)
+                if state['result'] is not None:
+                    return state
+        
+        # Embed once: used for the cache lookup AND the vector query
+        if self.answer_cache is not None:
+            state['query_embedding'] = await self.vector_store.aembed(question)
+            state['version'] = self.vector_store.corpus_version(reference_id)
+            cached = self.answer_cache.get(
+                reference_id, filter_dict, question, state['query_embedding'], state['version']
+            )
+            if cached is not None:
+                print(f"⚡ Answer cache hit: {question}")
+                state['result'] = cached
+                return state
         
         # Retrieve MORE results for diversity
-        all_results = self.vector_store.query(
-            query_text=question,
-            n_results=15,  # Get many results
-            filter_dict=filter_dict
+        retrieve = (
+            self.vector_store.ahybrid_query if self.retrieval_mode == "hybrid"
+            else self.vector_store.aquery
         )
+        with span("retrieve"):
+            all_results = await retrieve(
+                query_text=question,
+                n_results=self.n_candidates,  # Get many results
+                filter_dict=filter_dict,
+                query_embedding=state['query_embedding']
+            )
         
         # CRITICAL: Ensure diversity by doc_type
-        results = self._ensure_diversity(all_results, target=5)
+        with span("diversify"):
+            results = self._ensure_diversity(all_results, target=5)
+        state['results'] = results
         
         # DEBUG
         print(f"\n🔍 Query: {question}")
@@ -38,34 +177,108 @@ class RAGEngine:
             doc_types = [r['metadata'].get('doc_type') for r in results]
             print(f"📄 Final doc types: {doc_types}")
         
-        # Check if we have results
-        if not results or results[0]['distance'] > 2.0:
-            return {
-                'answer': "❌ Not found in document - no relevant content retrieved.",
-                'confidence': 0.0,
-                'sources': []
-            }
+        # Check if we have results (hybrid order: the best distance may not be first)
+        if not results or min(r['distance'] for r in results) > 2.0:
+            self._not_found(state, question)
+        elif self.gate is not None:
+            # Pre-LLM gate: weak retrievals are answered without generation
+            decision = self.gate.evaluate(question, await self._context(state))
+            if decision['decision'] == 'reject':
+                self._not_found(state, question)
+            elif decision['decision'] == 'extractive':
+                # Answered BECAUSE retrieval was weak: always below the low threshold
+                low = self.calibration.low if self.calibration is not None else LOW_CONFIDENCE
+                state['result'] = self._finalize(
+                    state, question, decision['answer'], max_confidence=round(low - 0.01, 2)
+                )
         
-        # Generate answer
-        answer, _ = self._generate_answer(question, results)
+        return state
+    
+    def _not_found(self, state: Dict, question: str):
+        state['result'] = {
+            'answer': "❌ Not found in document - no relevant content retrieved.",
+            'confidence': 0.0,
+            'sources': []
+        }
+        self._cache_result(state, question, state['result'])
+    
+    async def _context(self, state: Dict) -> List[Dict]:
+        """Retrieved chunks with parent headers re-attached (fetched once per request)"""
+        if state['context'] is None:
+            state['context'] = await self._with_headers(state['results'])
+        return state['context']
+    
+    def _finalize(self, state: Dict, question: str, answer: str,
+                  max_confidence: Optional[float] = None) -> Dict:
+        """
+        Confidence + guardrails on a generated answer; caches the result
+        max_confidence: Cap for answers known to be weak (gate extractive)
+        """
+        results = state['results']
         
         # Calculate confidence
-        confidence = calculate_confidence(question, results, answer)
-        final_answer = apply_guardrails(answer, confidence)
+        with span("confidence"):
+            confidence = calculate_confidence(question, results, answer, self.calibration)
+            if max_confidence is not None:
+                confidence = min(confidence, max_confidence)
+            if self.calibration is not None:
+                final_answer = apply_guardrails(
+                    answer, confidence, self.calibration.low, self.calibration.verify
+                )
+            else:
+                final_answer = apply_guardrails(answer, confidence)
         
-        return {
+        result = {
             'answer': final_answer,
             'confidence': confidence,
-            'sources': [
-                {
-                    'content': r['content'][:200] + '...',
-                    'doc_type': r['metadata'].get('doc_type'),
-                    'section': r['metadata'].get('section_type'),
-                    'distance': round(r['distance'], 3)
-                }
-                for r in results[:3]
-            ]
+            'sources': self._format_sources(results)
         }
+        self._cache_result(state, question, result)
+        return result
+    
+    @staticmethod
+    def _format_sources(results: List[Dict]) -> List[Dict]:
+        return [
+            {
+                'content': r['content'][:200] + '...',
+                'doc_type': r['metadata'].get('doc_type'),
+                'section': r['metadata'].get('section_type'),
+                'distance': round(r['distance'], 3)
+            }
+            for r in results[:3]
+        ]
+    
+    def _cache_result(self, state: Dict, question: str, result: Dict):
+        """Store an answer against the corpus version seen BEFORE retrieval"""
+        if self.answer_cache is not None:
+            self.answer_cache.set(
+                state['reference_id'], state['filter_dict'], question,
+                state['query_embedding'], state['version'], result
+            )
+    
+    async def _with_headers(self, results: List[Dict]) -> List[Dict]:
+        """
+        Prepend each section chunk's parent header (stored once per document)
+        The header text is also kept under 'header' for the prompt budget
+        """
+        header_ids = [
+            r['metadata'].get('header_id') for r in results
+            if r['metadata'].get('section_type') != 'header'
+        ]
+        headers = await self.vector_store.aget_headers(
+            header_ids, [r['metadata'].get('reference_id') for r in results]
+        )
+        if not headers:
+            return results
+        
+        return [
+            {**r, 'header': headers[r['metadata']['header_id']],
+             'content': f"{headers[r['metadata']['header_id']]}\n\n{r['content']}"}
+            if r['metadata'].get('section_type') != 'header'
+            and r['metadata'].get('header_id') in headers
+            else r
+            for r in results
+        ]
     
     def _ensure_diversity(self, results: List[Dict], target: int = 5) -> List[Dict]:
         """
@@ -101,10 +314,12 @@ class RAGEngine:
         
         return diversified[:target]
     
-    def _build_filter(self, question: str, reference_id: str = None) -> Dict:
+    def _build_filter(self, question: str, reference_id: str = None, tenant_id: str = None) -> Dict:
         """Build smart filters based on question intent"""
         filter_dict = {}
         
+        if tenant_id:
+            filter_dict['tenant_id'] = tenant_id
         if reference_id:
             filter_dict['reference_id'] = reference_id
         
@@ -122,13 +337,28 @@ class RAGEngine:
         print(f"🔎 Filter: {filter_dict}")
         return filter_dict
     
-    def _generate_answer(self, question: str, results: List[Dict]) -> Tuple[str, str]:
+    async def _generate_answer(self, question: str, results: List[Dict]) -> Tuple[str, str]:
         """Generate answer from retrieved context"""
-        context = "\n\n---\n\n".join([
-            f"[Source {i+1} - {r['metadata'].get('doc_type')} - {r['metadata'].get('section_type')}]\n{r['content']}" 
-            for i, r in enumerate(results)
-        ])
+        prompt, context = self._build_prompt(question, results)
         
+        with span("generate"):
+            response = await self.client.chat.completions.create(**self._completion_args(prompt))
+        record_usage(ANSWER_MODEL, getattr(response, 'usage', None))
+        
+        answer = response.choices[0].message.content
+        return answer, context
+    
+    @staticmethod
+    def _completion_args(prompt: str) -> Dict:
+        return {
+            'model': ANSWER_MODEL,
+            'messages': [{"role": "user", "content": prompt}],
+            'temperature': 0.1,
+            'max_tokens': 150
+        }
+    
+    def _build_prompt(self, question: str, results: List[Dict]) -> Tuple[str, str]:
+        """Prompt + context for the answer model"""
         # Detect verification questions
         is_verification = any(word in question.lower() for word in ['same', 'consistent', 'match', 'all documents', 'across'])
         
@@ -148,7 +378,31 @@ class RAGEngine:
     4. Keep answer focused and concise (2-3 sentences)
     5. Cite sources in brackets like [Source 1]"""
         
-        prompt = f"""You are analyzing logistics documents for shipment LD53657.
+        labels = [
+            f"[Source {i+1} - {r['metadata'].get('doc_type')} - {r['metadata'].get('section_type')}]"
+            for i, r in enumerate(results)
+        ]
+        contents = [r['content'] for r in results]
+        
+        if self.prompt_budget is not None:
+            # Results are ranked: repeated headers go first, then the tail
+            reserved = count_tokens(self._prompt(question, "", instructions))
+            reserved += sum(count_tokens(label + "\n\n---\n\n") for label in labels)
+            contents, _ = self.prompt_budget.fit(
+                contents, reserved_tokens=reserved, headers=[r.get('header') for r in results]
+            )
+        
+        # Source numbers stay those of the ranking (and of the returned sources)
+        context = "\n\n---\n\n".join([
+            f"{label}\n{content}"
+            for label, content in zip(labels, contents) if content
+        ])
+        
+        return self._prompt(question, context, instructions), context
+    
+    @staticmethod
+    def _prompt(question: str, context: str, instructions: str) -> str:
+        return f"""You are analyzing logistics documents for shipment LD53657.
 
     Context from multiple documents:
     {context}
@@ -158,13 +412,3 @@ class RAGEngine:
     {instructions}
 
     Answer:"""
-        
-        response = self.client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=150
-        )
-        
-        answer = response.choices[0].message.content
-        return answer, context
@@ -0,0 +1,111 @@
+"""
+Retrieval Gate: Decide before the LLM call whether retrieval can support an answer
+pass → generate; extractive → best matching source line, no LLM;
+reject → "not found", no LLM
+"""
+import re
+from typing import Dict, List, Set
+
+from .guardrails import check_retrieval_quality
+from .metrics import LLM_CALLS_SAVED, REGISTRY
+
+GATE_DECISIONS = REGISTRY.counter(
+    "udi_retrieval_gate_total", "Retrieval gate decisions", ("decision",)
+)
+
+WORD = re.compile(r'[a-z0-9]+')
+STOPWORDS = {
+    'what', 'which', 'who', 'whom', 'when', 'where', 'why', 'how', 'the', 'and', 'for', 'are',
+    'was', 'were', 'is', 'this', 'that', 'these', 'those', 'with', 'from', 'there', 'any', 'all',
+    'does', 'did', 'can', 'you', 'tell', 'give', 'show', 'please', 'about', 'document',
+    'documents', 'shipment', 'load', 'same', 'across', 'have', 'has', 'its', 'our', 'their'
+}
+
+
+def question_keywords(question: str) -> Set[str]:
+    """Content words of a question (3+ chars, no stopwords)"""
+    return {w for w in WORD.findall(question.lower()) if len(w) >= 3 and w not in STOPWORDS}
+
+
+def matched_keywords(keywords: Set[str], text: str) -> Set[str]:
+    """Keywords present in text as whole words (plural "s" allowed: "rate" ≠ "separate")"""
+    words = set(WORD.findall(text.lower()))
+    return {k for k in keywords if k in words or f"{k}s" in words}
+
+
+class RetrievalGate:
+    def __init__(self,
+                 max_distance: float = 0.85,
+                 max_mean_distance: float = 1.2,
+                 min_coverage: float = 0.5,
+                 extractive_coverage: float = 0.25,
+                 agreement_k: int = 3,
+                 extractive: bool = True):
+        """
+        max_distance: Best-chunk distance (minimum over results, whatever
+        their order) that passes check_retrieval_quality
+        max_mean_distance: Mean distance of the agreement_k nearest chunks
+        that still counts as agreement
+        min_coverage: Share of question keywords found in the top chunks
+        that sends a weak retrieval to the LLM anyway
+        extractive_coverage: Below min_coverage but at least this much →
+        answer with the best matching source line (extractive=False: reject)
+        """
+        self.max_distance = max_distance
+        self.max_mean_distance = max_mean_distance
+        self.min_coverage = min_coverage
+        self.extractive_coverage = extractive_coverage
+        self.agreement_k = agreement_k
+        self.extractive = extractive
+
+    def evaluate(self, question: str, results: List[Dict]) -> Dict:
+        """
+        results: Ranked chunks as they would go into the prompt (headers attached)
+        Returns {'decision', 'reason', 'coverage', 'answer' (extractive only)}
+        """
+        top = results[:self.agreement_k]
+        keywords = question_keywords(question)
+        found = matched_keywords(keywords, " ".join(r['content'] for r in top))
+        coverage = len(found) / len(keywords) if keywords else 1.0
+
+        nearest = sorted(r['distance'] for r in results)[:self.agreement_k]
+        strong = (
+            check_retrieval_quality(results, threshold=self.max_distance)
+            and sum(nearest) / len(nearest) <= self.max_mean_distance
+        )
+        if strong:
+            decision = {'decision': 'pass', 'reason': 'distance'}
+        elif coverage >= self.min_coverage:
+            decision = {'decision': 'pass', 'reason': 'keywords'}
+        else:
+            answer = (
+                self._extractive_answer(keywords, top)
+                if self.extractive and coverage >= self.extractive_coverage else None
+            )
+            if answer:
+                decision = {'decision': 'extractive', 'reason': 'weak_retrieval', 'answer': answer}
+            else:
+                decision = {'decision': 'reject', 'reason': 'weak_retrieval'}
+        decision['coverage'] = round(coverage, 2)
+
+        GATE_DECISIONS.inc(decision=decision['decision'])
+        if decision['decision'] != 'pass':
+            LLM_CALLS_SAVED.inc(reason=f"gate_{decision['decision']}")
+        print(f"🚦 Retrieval gate: {decision['decision']} ({decision['reason']}, "
+              f"coverage {decision['coverage']}, best distance {min(r['distance'] for r in results):.3f})")
+        return decision
+
+    @staticmethod
+    def _extractive_answer(keywords: Set[str], results: List[Dict]) -> str:
+        """Source line covering the most keywords (lines with values win ties)"""
+        best, best_score = None, (0, False)
+        for i, r in enumerate(results):
+            for line in r['content'].split("\n"):
+                hits = len(matched_keywords(keywords, line))
+                score = (hits, any(c.isdigit() for c in line))
+                if hits and score > best_score:
+                    best, best_score = (line.strip(), i), score
+        if best is None:
+            return ""
+        line, i = best
+        return f"Closest match in the documents: {line} [Source {i + 1}]"
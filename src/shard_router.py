@@ -0,0 +1,89 @@
+"""
+Shard Router: Maps chunks and queries to Chroma collections
+"none" keeps one global collection; "tenant" and "month" split it so each
+query only searches the HNSW indexes it needs
+"""
+import hashlib
+import re
+import time
+from typing import Dict, List, Optional
+
+STRATEGIES = ('none', 'tenant', 'month')
+
+DATE_PATTERNS = (
+    re.compile(r'\b(\d{4})-(\d{1,2})-\d{1,2}\b'),          # 2026-02-08
+    re.compile(r'\b(\d{1,2})/\d{1,2}/(\d{4})\b'),          # 02/08/2026
+)
+
+
+def shard_month(date: Optional[str]) -> Optional[str]:
+    """'2026-02-08' or '02/08/2026' → '2026-02'"""
+    if not date:
+        return None
+    match = DATE_PATTERNS[0].search(date)
+    if match:
+        return f"{match.group(1)}-{int(match.group(2)):02d}"
+    match = DATE_PATTERNS[1].search(date)
+    if match:
+        return f"{match.group(2)}-{int(match.group(1)):02d}"
+    return None
+
+
+class ShardRouter:
+    def __init__(self,
+                 strategy: str = "none",
+                 base_name: str = "logistics_docs",
+                 tenant_key: str = "tenant_id",
+                 date_key: str = "pickup_date"):
+        """
+        strategy: "none" (single collection), "tenant" (one per tenant_key)
+        or "month" (one per month of date_key, ingest month if missing)
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown shard strategy: {strategy} (expected one of {STRATEGIES})")
+        self.strategy = strategy
+        self.base_name = base_name
+        self.tenant_key = tenant_key
+        self.date_key = date_key
+        # Month shards follow the first document of a load; tenant shards don't
+        self.pins_references = strategy == "month"
+
+    def is_shard(self, name: str) -> bool:
+        """Whether a collection name belongs to this store"""
+        return name == self.base_name or name.startswith(f"{self.base_name}-")
+
+    def shard_for(self, metadatas: List[Dict], existing: List[str] = ()) -> str:
+        """
+        Collection for one document's chunks (all land in the same shard)
+        existing: Shards already holding this reference_id
+        """
+        if self.strategy == "tenant":
+            # Tenant is authoritative: equal reference_ids of two tenants stay apart
+            tenant = next((m[self.tenant_key] for m in metadatas if m.get(self.tenant_key)), None)
+            return self._tenant_shard(str(tenant)) if tenant else self.base_name
+
+        if self.strategy == "month":
+            if existing:
+                return sorted(existing)[0]  # Keep a load's documents together
+            month = next(
+                (shard_month(m.get(self.date_key)) for m in metadatas
+                 if shard_month(m.get(self.date_key))),
+                None
+            )
+            return f"{self.base_name}-m-{month or time.strftime('%Y-%m', time.gmtime())}"
+
+        return self.base_name
+
+    def shard_for_filter(self, filter_dict: Optional[Dict]) -> Optional[str]:
+        """The single shard a filter pins down, or None (resolve by reference_id / fan out)"""
+        if self.strategy == "none":
+            return self.base_name
+        if self.strategy == "tenant" and (filter_dict or {}).get(self.tenant_key):
+            return self._tenant_shard(str(filter_dict[self.tenant_key]))
+        return None
+
+    def _tenant_shard(self, tenant: str) -> str:
+        """Valid Chroma name (3-63 chars, [a-z0-9-]) that never collides across tenants"""
+        slug = re.sub(r'[^a-z0-9]+', '-', tenant.lower()).strip('-')[:24] or "t"
+        digest = hashlib.sha256(tenant.encode('utf-8')).hexdigest()[:8]
+        return f"{self.base_name}-t-{slug}-{digest}"
@@ -0,0 +1,59 @@
+"""
+Single Flight: Concurrent calls with the same key share one computation
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from .metrics import REGISTRY
+
+T = TypeVar("T")
+
+CALLS = REGISTRY.counter(
+    "udi_single_flight_calls_total",
+    "Calls through a single-flight group (leader = ran the work, coalesced = shared it)",
+    ("group", "role")
+)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        """name: Label for metrics (e.g. "ask", "extract")"""
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() unless a call with this key is already in flight, in which
+        case wait for that call's result (or exception)
+
+        The work runs as its own task: a caller disconnecting cancels only
+        its wait, not the computation other callers share.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+            CALLS.inc(group=self.name, role="leader")
+        else:
+            self.coalesced += 1
+            CALLS.inc(group=self.name, role="coalesced")
+            print(f"🔗 Coalesced {self.name} request onto in-flight call")
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved even if every waiter went away
+
+    def stats(self) -> Dict:
+        return {
+            'in_flight': len(self._inflight),
+            'leaders': self.leaders,
+            'coalesced': self.coalesced
+        }
@@ -2,7 +2,41 @@
 Utility functions for metadata extraction
 """
 import re
-from typing import Optional
+from typing import Dict, Optional
+
+TOKENIZER_ENCODING = "cl100k_base"
+
+_encoder = None
+_encoder_loaded = False
+
+def load_tokenizer() -> str:
+    """
+    Load the token encoder once (at startup: tiktoken may download the
+    encoding on first use) and return its identity for cache keys
+    """
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        _encoder_loaded = True
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            print(f"⚠️ tiktoken {TOKENIZER_ENCODING} unavailable ({type(e).__name__}), "
+                  f"counting ~4 characters per token")
+            _encoder = None
+    return f"tiktoken:{TOKENIZER_ENCODING}" if _encoder is not None else "chars/4"
+
+def count_tokens(text: str) -> int:
+    """
+    Token count for budgeting (cl100k_base via tiktoken)
+    Falls back to ~4 characters per token if the encoding is unavailable
+    """
+    if not _encoder_loaded:
+        load_tokenizer()
+    
+    if _encoder is not None:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
 
 def extract_reference_id(text: str) -> Optional[str]:
     """Extract reference ID from document text"""
@@ -33,10 +67,19 @@ def extract_reference_id(text: str) -> Optional[str]:
     
     return "UNKNOWN"
 
+def extract_pickup_date(text: str) -> Optional[str]:
+    """Pickup/ship date as written in the document (e.g. 02/08/2026), or None"""
+    match = re.search(
+        r'(?:Pickup|Pick\s*Up|Ship)\s*Date[|:*\s]+(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{1,2}-\d{1,2})',
+        text, re.IGNORECASE
+    )
+    return match.group(1) if match else None
+
 def detect_doc_type(text: str) -> str:
     """Detect document type from content"""
-    text_lower = text.lower()
-    
+    return _doc_type(text.lower())
+
+def _doc_type(text_lower: str) -> str:
     if 'customer rate' in text_lower or 'customer details' in text_lower:
         return 'shipper_rc'
     elif 'carrier rate' in text_lower or 'carrier details' in text_lower:
@@ -44,4 +87,104 @@ def detect_doc_type(text: str) -> str:
     elif 'bill of lading' in text_lower:
         return 'bol'
     else:
-        return 'unknown'
\ No newline at end of file
+        return 'unknown'
+
+def identify_section(section: str) -> str:
+    """Identify section type by keywords"""
+    return _section_type(section.lower())
+
+def _section_type(section_lower: str) -> str:
+    if 'rate' in section_lower and 'breakdown' in section_lower:
+        return 'rates'
+    elif 'pickup' in section_lower or 'stop' in section_lower and '1' in section_lower:
+        return 'pickup'
+    elif 'delivery' in section_lower or 'drop' in section_lower or ('stop' in section_lower and '2' in section_lower):
+        return 'delivery'
+    elif 'driver' in section_lower:
+        return 'driver_details'
+    elif 'instruction' in section_lower:
+        return 'instructions'
+    elif 'carrier details' in section_lower:
+        return 'carrier_info'
+    elif 'customer details' in section_lower:
+        return 'customer_info'
+    elif 'commodity' in section_lower or 'weight' in section_lower:
+        return 'commodity_details'
+    else:
+        return 'general'
+
+# scan_document: precompiled, case-sensitive versions of the patterns above,
+# run on the document lowercased once (values are read back from the
+# original text at the same offsets)
+REFERENCE_PATTERNS = [
+    re.compile(r'\|\s*reference\s+id\s*\|\s*([a-z0-9]+)'),
+    re.compile(r'\*\*reference\s+id[:\s]*\*\*\s*([a-z0-9]+)'),
+    re.compile(r'reference\s+id[:\s]+([a-z0-9]+)'),
+]
+LOAD_ID_PATTERN = re.compile(r'load\s+id[:\s]+([a-z0-9]+)')
+DIRECT_ID_PATTERN = re.compile(r'(LD[0-9]{5}|BOL[0-9]{5})\b')  # Leading \b checked by hand
+PICKUP_DATE_PATTERN = re.compile(
+    r'(?:pickup|pick\s*up|ship)\s*date[|:*\s]+(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{1,2}-\d{1,2})'
+)
+
+def scan_document(text: str) -> Dict:
+    """
+    reference_id, doc_type, pickup_date and per-section types in one call
+
+    Same results as extract_reference_id / detect_doc_type /
+    extract_pickup_date / identify_section, with one lowercasing pass, no
+    case-insensitive regex scans and one slice per section instead of a
+    split + lowercase per section. section_types is aligned with
+    re.split(r'\n(?=##\s)', text); entry 0 is the header.
+    """
+    if not text.isascii():
+        # Case folding may change offsets; use the per-field functions
+        sections = re.split(r'\n(?=##\s)', text)
+        return {
+            'reference_id': extract_reference_id(text),
+            'doc_type': detect_doc_type(text),
+            'pickup_date': extract_pickup_date(text),
+            'section_types': ['header'] + [identify_section(s) for s in sections[1:]]
+        }
+
+    lower = text.lower()
+
+    # Section starts: "\n##" followed by whitespace
+    starts = [0]
+    i = lower.find('\n##')
+    while i >= 0:
+        if i + 3 < len(lower) and lower[i + 3].isspace():
+            starts.append(i + 1)
+        i = lower.find('\n##', i + 1)
+    ends = [start - 1 for start in starts[1:]] + [len(text)]
+    section_types = ['header'] + [
+        _section_type(lower[start:end])
+        for start, end in zip(starts[1:], ends[1:])
+    ]
+
+    date = PICKUP_DATE_PATTERN.search(lower) if 'date' in lower else None
+    return {
+        'reference_id': _scan_reference_id(text, lower),
+        'doc_type': _doc_type(lower),
+        'pickup_date': text[date.start(1):date.end(1)] if date else None,
+        'section_types': section_types
+    }
+
+def _scan_reference_id(text: str, lower: str) -> str:
+    """extract_reference_id priority order over the lowercased text"""
+    for pattern in REFERENCE_PATTERNS + [LOAD_ID_PATTERN]:
+        match = pattern.search(lower)
+        if match:
+            return text[match.start(1):match.end(1)]
+
+    # Leftmost LD/BOL id: jump between literal occurrences (str.find)
+    found = None
+    for prefix in ('LD', 'BOL'):
+        i = text.find(prefix)
+        while i >= 0 and (found is None or i < found[0]):
+            match = DIRECT_ID_PATTERN.match(text, i)
+            if match and (i == 0 or not (text[i - 1].isalnum() or text[i - 1] == '_')):
+                found = (i, match.group(1))
+                break
+            i = text.find(prefix, i + 1)
+    return found[1] if found else "UNKNOWN"
@@ -1,11 +1,85 @@
 import chromadb
+from chromadb.api.models.Collection import Collection
+from chromadb.api.types import EmbeddingFunction
 from chromadb.config import Settings
-from typing import List, Dict
-import uuid
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Dict, Optional, Tuple
+import asyncio
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
+from .lexical_index import BM25Index
+from .metrics import span
+from .shard_router import ShardRouter
+
+class CorpusVersions:
+    """
+    Ingest counters persisted next to the Chroma data
+    Shared by every process writing the store (API, ingest.py), so an
+    answer cached by the API goes stale when the CLI re-ingests its load
+    """
+    EPOCH = "#epoch"
+    GLOBAL = "*"
+
+    def __init__(self, db_path: str):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS versions (key TEXT PRIMARY KEY, version INTEGER)"
+            )
+
+    def get(self, reference_id: Optional[str] = None) -> Tuple[int, int]:
+        """(epoch, version of reference_id or of the whole corpus)"""
+        key = f"ref:{reference_id}" if reference_id else self.GLOBAL
+        with self._lock:
+            rows = dict(self._conn.execute(
+                "SELECT key, version FROM versions WHERE key IN (?, ?)", (self.EPOCH, key)
+            ).fetchall())
+        return (rows.get(self.EPOCH, 0), rows.get(key, 0))
+
+    def bump(self, reference_ids: Iterable[str] = (), epoch: bool = False) -> None:
+        """New chunks for these loads (the global version always moves)"""
+        keys = [f"ref:{r}" for r in set(reference_ids)] + [self.GLOBAL]
+        if epoch:
+            keys.append(self.EPOCH)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO versions VALUES (?, 1) "
+                "ON CONFLICT (key) DO UPDATE SET version = version + 1",
+                [(k, ) for k in keys]
+            )
+
 
 class VectorStore:
-    def __init__(self, persist_directory: str = "./data/chroma_db"):
-        """Initialize ChromaDB with persistence"""
+    def __init__(self,
+                 persist_directory: str = "./data/chroma_db",
+                 max_workers: int = 4,
+                 embedding_function: Optional[EmbeddingFunction] = None,
+                 lexical_index: Optional[BM25Index] = None,
+                 router: Optional[ShardRouter] = None,
+                 fanout_workers: int = 8,
+                 versions_path: Optional[str] = None):
+        """
+        Initialize ChromaDB with persistence
+        
+        max_workers: Size of the thread pool that runs blocking Chroma
+        calls (embedding + HNSW) for the async API
+        embedding_function: Any Chroma EmbeddingFunction (see src/embeddings.py);
+        defaults to Chroma's built-in MiniLM model
+        lexical_index: Optional BM25 index kept in sync with the collection
+        for hybrid_query
+        router: Shard layout (see src/shard_router.py); defaults to a single
+        "logistics_docs" collection
+        fanout_workers: Threads used to query several shards in parallel
+        versions_path: SQLite file for corpus versions (default: inside
+        persist_directory, shared with other processes using it)
+        """
         self.client = chromadb.PersistentClient(
             path=persist_directory,
             settings=Settings(
@@ -14,18 +88,240 @@ class VectorStore:
             )
         )
         
-        self.collection = self.client.get_or_create_collection(
-            name="logistics_docs",
-            metadata={"description": "Logistics document chunks"}
+        # Held explicitly so queries can be embedded once and reused
+        self.embedding_function = embedding_function or DefaultEmbeddingFunction()
+        
+        # Shards: collections are opened lazily and cached client-side
+        self.router = router or ShardRouter()
+        self._collections: Dict[str, Collection] = {}
+        self._collections_lock = threading.Lock()
+        
+        # Corpus versions: bumped on every ingest so answer caches can
+        # tell when their entries are stale
+        self.versions = CorpusVersions(
+            versions_path or os.path.join(persist_directory, "corpus_versions.db")
+        )
+        
+        # Shard names are re-listed whenever the corpus version moves
+        # (another process may have created a tenant/month shard)
+        self._shards_version = self.versions.get()
+        self._shard_names = self._list_shards()
+        if self.router.strategy == "none":
+            self._collection(self.router.base_name)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="chroma"
+        )
+        self._fanout = ThreadPoolExecutor(
+            max_workers=fanout_workers,
+            thread_name_prefix="shard"
+        )
+        
+        # Secondary indexes (filled lazily from Chroma):
+        # (shard, reference_id) → (load version, chunk ids), (reference_id, tenant_id) → shards
+        # (tenant_id None = any tenant). Both are refetched once the load's
+        # version in CorpusVersions moves, whichever process stored the chunks
+        self._ref_index: Dict[Tuple[str, str], Tuple[Tuple[int, int], set]] = {}
+        self._ref_shards: Dict[Tuple[str, Optional[str]], Tuple[Tuple[int, int], set]] = {}
+        self._ref_lock = threading.Lock()
+        
+        self.lexical_index = lexical_index
+        if lexical_index is not None and len(lexical_index) == 0 and self.count():
+            self.rebuild_lexical_index()
+    
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking call on the bounded Chroma executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+    
+    async def aadd_chunks(self, chunks: List[Dict], replace: bool = False) -> int:
+        """Async add_chunks (runs on the Chroma executor)"""
+        return await self._run(self.add_chunks, chunks, replace=replace)
+    
+    async def aquery(self,
+                     query_text: str,
+                     n_results: int = 5,
+                     filter_dict: Dict = None,
+                     query_embedding: List[float] = None) -> List[Dict]:
+        """Async query (runs on the Chroma executor)"""
+        return await self._run(
+            self.query, query_text,
+            n_results=n_results,
+            filter_dict=filter_dict,
+            query_embedding=query_embedding
         )
     
-    def add_chunks(self, chunks: List[Dict]) -> int:
-        """Add chunks to vector store"""
-        documents = [chunk['content'] for chunk in chunks]
+    async def ahybrid_query(self,
+                            query_text: str,
+                            n_results: int = 5,
+                            filter_dict: Dict = None,
+                            query_embedding: List[float] = None) -> List[Dict]:
+        """Async hybrid_query (runs on the Chroma executor)"""
+        return await self._run(
+            self.hybrid_query, query_text,
+            n_results=n_results,
+            filter_dict=filter_dict,
+            query_embedding=query_embedding
+        )
+    
+    async def aget_headers(self, header_ids: List[str],
+                           reference_ids: List[str] = None) -> Dict[str, str]:
+        """Async get_headers (runs on the Chroma executor)"""
+        return await self._run(self.get_headers, header_ids, reference_ids)
+    
+    async def aget_by_reference_id(self, reference_id: str,
+                                   tenant_id: str = None) -> List[Dict]:
+        """Async get_by_reference_id (runs on the Chroma executor)"""
+        return await self._run(self.get_by_reference_id, reference_id, tenant_id=tenant_id)
+    
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the collection's embedding function"""
+        with span("embed"):
+            return [[float(x) for x in v] for v in self.embedding_function(texts)]
+    
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text with the collection's embedding function"""
+        return self.embed_many([text])[0]
+    
+    async def aembed(self, text: str) -> List[float]:
+        """Async embed (runs on the Chroma executor)"""
+        return await self._run(self.embed, text)
+    
+    def _collection(self, name: str) -> Collection:
+        """Open (creating if needed) a shard's collection; cached per process"""
+        with self._collections_lock:
+            collection = self._collections.get(name)
+            if collection is None:
+                collection = self.client.get_or_create_collection(
+                    name=name,
+                    metadata={"description": "Logistics document chunks"},
+                    embedding_function=self.embedding_function
+                )
+                self._collections[name] = collection
+                self._shard_names.add(name)
+            return collection
+    
+    def _list_shards(self) -> set:
+        return {
+            name for name in (getattr(c, 'name', c) for c in self.client.list_collections())
+            if self.router.is_shard(name)
+        }
+    
+    def shards(self, refresh: bool = False) -> List[str]:
+        """
+        Existing shards
+        refresh: Re-list collections even if the corpus version hasn't moved
+        """
+        version = self.versions.get()
+        with self._collections_lock:
+            if refresh or version != self._shards_version:
+                self._shard_names = self._list_shards()
+                for name in set(self._collections) - self._shard_names:  # Cleared elsewhere
+                    del self._collections[name]
+                self._shards_version = version
+            return sorted(self._shard_names)
+    
+    def _fan_out(self, fn, names: List[str]) -> List:
+        """fn(shard) for every shard, in parallel when there are several"""
+        if len(names) <= 1:
+            return [fn(name) for name in names]
+        return list(self._fanout.map(fn, names))
+    
+    def _reference_shards(self, reference_id: str, tenant_id: Optional[str] = None) -> List[str]:
+        """
+        Shards holding a reference_id (probed once per load version, then remembered)
+        tenant_id: Only shards holding that tenant's chunks of it
+        """
+        key = (reference_id, str(tenant_id) if tenant_id else None)
+        version = self.versions.get(reference_id)
+        with self._ref_lock:
+            known = self._ref_shards.get(key)
+        if known and known[0] == version:
+            return sorted(known[1])
+        
+        where = self._where({'reference_id': reference_id, self.router.tenant_key: key[1]})
+        names = self.shards()
+        hits = self._fan_out(
+            lambda name: bool(self._collection(name).get(where=where, include=[], limit=1)['ids']),
+            names
+        )
+        found = {name for name, hit in zip(names, hits) if hit}
+        if found:  # Misses aren't cached: another process may ingest it later
+            with self._ref_lock:
+                self._ref_shards[key] = (version, found)
+        return sorted(found)
+    
+    def _shards_for(self, filter_dict: Optional[Dict]) -> List[str]:
+        """Existing shards a filtered read has to search"""
+        name = self.router.shard_for_filter(filter_dict)
+        if name is not None:
+            if name in self.shards():
+                return [name]
+            return [name] if name in self.shards(refresh=True) else []
+        
+        reference_id = (filter_dict or {}).get('reference_id')
+        if reference_id:
+            return self._reference_shards(reference_id, filter_dict.get(self.router.tenant_key))
+        return self.shards()
+    
+    def shard_counts(self) -> Dict[str, int]:
+        """Chunks per shard"""
+        names = self.shards()
+        return dict(zip(names, self._fan_out(lambda name: self._collection(name).count(), names)))
+    
+    def count(self) -> int:
+        """Chunks across all shards"""
+        return sum(self.shard_counts().values())
+    
+    def corpus_version(self, reference_id: Optional[str] = None) -> Tuple[int, int]:
+        """
+        Version of the chunks visible to a query
+        Per reference_id when scoped, otherwise the whole collection
+        (read from the shared versions file, so other processes' ingests count)
+        """
+        return self.versions.get(reference_id)
+    
+    @staticmethod
+    def chunk_id(chunk: Dict) -> str:
+        """
+        Deterministic id: reference_id + doc_type + chunk_id + content hash
+        (+ tenant_id when set). Re-ingesting the same document yields the same ids
+        """
+        metadata = chunk['metadata']
+        content_hash = hashlib.sha256(chunk['content'].encode('utf-8')).hexdigest()
+        parts = [
+            str(metadata.get('reference_id', 'UNKNOWN')),
+            str(metadata.get('doc_type', 'unknown')),
+            str(metadata.get('chunk_id', '')),
+            content_hash
+        ]
+        if metadata.get('tenant_id'):
+            parts.append(str(metadata['tenant_id']))
+        key = "|".join(parts)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+    
+    def add_chunks(self, chunks: List[Dict], replace: bool = False) -> int:
+        """
+        Add chunks to vector store (idempotent upsert)
+        Chunks may carry a precomputed 'embedding'; otherwise they are embedded here
+        
+        replace: Also delete chunks previously stored for the same
+        reference_id + doc_type that are not part of this batch
+        """
+        # Deduplicate within the batch (same id = same content)
+        unique = {}
+        for chunk in chunks:
+            unique.setdefault(self.chunk_id(chunk), chunk)
+        
+        ids = list(unique.keys())
+        documents = [chunk['content'] for chunk in unique.values()]
         
         # FIXED: Clean metadata - remove None values
         metadatas = []
-        for chunk in chunks:
+        for chunk in unique.values():
             clean_metadata = {}
             for key, value in chunk['metadata'].items():
                 if value is not None:  # Only add non-None values
@@ -33,43 +329,352 @@ class VectorStore:
                     clean_metadata[key] = str(value)
             metadatas.append(clean_metadata)
         
-        ids = [str(uuid.uuid4()) for _ in chunks]
+        if not ids:
+            return 0
         
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Embed here rather than inside Chroma so embed and store are timed apart
+        if all('embedding' in chunk for chunk in unique.values()):
+            embeddings = [chunk['embedding'] for chunk in unique.values()]
+        else:
+            embeddings = self.embed_many(documents)
         
-        return len(chunks)
+        # One shard per document: group the batch by reference_id (+ tenant,
+        # so one tenant's load never pins another tenant's shard)
+        by_shard = defaultdict(list)
+        by_reference = defaultdict(list)
+        for i, metadata in enumerate(metadatas):
+            by_reference[(metadata.get('reference_id', 'UNKNOWN'), metadata.get('tenant_id'))].append(i)
+        for (reference_id, tenant_id), positions in by_reference.items():
+            existing = (
+                self._reference_shards(reference_id, tenant_id) if self.router.pins_references else ()
+            )
+            shard = self.router.shard_for([metadatas[i] for i in positions], existing)
+            by_shard[shard].extend(positions)
+        
+        with span("store"):
+            for shard, positions in by_shard.items():
+                self._add_to_shard(
+                    shard,
+                    [ids[i] for i in positions],
+                    [documents[i] for i in positions],
+                    [metadatas[i] for i in positions],
+                    [embeddings[i] for i in positions],
+                    replace
+                )
+        
+        self.versions.bump(reference_id for reference_id, _ in by_reference)
+        
+        return len(ids)
+    
+    def _add_to_shard(self, shard: str, ids: List[str], documents: List[str],
+                      metadatas: List[Dict], embeddings: List, replace: bool):
+        """Upsert one shard's part of a batch (+ lexical index)"""
+        collection = self._collection(shard)
+        
+        # Collect stale ids BEFORE upserting, delete them AFTER, so readers
+        # never see the document missing during re-ingest
+        stale_ids = self._stale_ids(collection, metadatas, set(ids)) if replace else []
+        
+        # Large (bulk) batches are split at Chroma's max batch size
+        step = self.client.get_max_batch_size()
+        for i in range(0, len(ids), step):
+            collection.upsert(
+                documents=documents[i:i + step],
+                metadatas=metadatas[i:i + step],
+                embeddings=embeddings[i:i + step],
+                ids=ids[i:i + step]
+            )
+        
+        if self.lexical_index is not None:
+            self.lexical_index.add(ids, documents, metadatas)
+        
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+            if self.lexical_index is not None:
+                self.lexical_index.delete(stale_ids)
+            print(f"🧹 Replaced {len(stale_ids)} stale chunks in {shard}")
+    
+    def _stale_ids(self, collection: Collection, metadatas: List[Dict], keep_ids: set) -> List[str]:
+        """
+        Ids stored for the batch's (reference_id, doc_type, tenant_id) but not in keep_ids
+        Another tenant's chunks of the same load are never replaced
+        """
+        documents = {
+            (m.get('reference_id', 'UNKNOWN'), m.get('doc_type', 'unknown'), m.get('tenant_id'))
+            for m in metadatas
+        }
+        
+        stale = []
+        for reference_id, doc_type, tenant_id in documents:
+            existing = collection.get(
+                where=self._where({
+                    'reference_id': reference_id,
+                    'doc_type': doc_type,
+                    'tenant_id': tenant_id
+                }),
+                include=['metadatas']
+            )
+            # Untenanted uploads only replace untenanted chunks (Chroma can't
+            # filter on a missing key)
+            stale.extend(
+                i for i, m in zip(existing['ids'], existing['metadatas'])
+                if i not in keep_ids and (m or {}).get('tenant_id') == tenant_id
+            )
+        return stale
     
     def query(self, 
               query_text: str, 
               n_results: int = 5,
-              filter_dict: Dict = None) -> List[Dict]:
-        """Query vector store"""
+              filter_dict: Dict = None,
+              query_embedding: List[float] = None) -> List[Dict]:
+        """
+        Query vector store (only the shards filter_dict routes to, in parallel)
+        query_embedding: Precomputed embedding of query_text (skips re-embedding)
+        """
+        shards = self._shards_for(filter_dict)
+        if not shards:
+            return []
+        
+        if query_embedding is not None:
+            query_args = {'query_embeddings': [query_embedding]}
+        elif len(shards) > 1:
+            query_args = {'query_embeddings': [self.embed(query_text)]}  # Embed once for all shards
+        else:
+            query_args = {'query_texts': [query_text]}
+        where = self._where(filter_dict)
+        
+        def query_shard(name: str) -> List[Dict]:
+            results = self._collection(name).query(
+                **query_args,
+                n_results=n_results,
+                where=where
+            )
+            
+            # Format results
+            formatted_results = []
+            for i in range(len(results['ids'][0])):
+                formatted_results.append({
+                    'id': results['ids'][0][i],
+                    'content': results['documents'][0][i],
+                    'metadata': results['metadatas'][0][i],
+                    'distance': results['distances'][0][i]
+                })
+            return formatted_results
+        
+        merged = [r for shard_results in self._fan_out(query_shard, shards) for r in shard_results]
+        return sorted(merged, key=lambda r: r['distance'])[:n_results]
+    
+    @staticmethod
+    def _where(filter_dict: Optional[Dict]) -> Optional[Dict]:
+        """
+        Equality filter dict → Chroma where clause
+        Drops None values; multiple keys must be wrapped in $and
+        """
         # FIXED: Clean filter_dict - remove None values
-        if filter_dict:
-            filter_dict = {k: v for k, v in filter_dict.items() if v is not None}
+        filter_dict = {k: v for k, v in (filter_dict or {}).items() if v is not None}
+        if not filter_dict:
+            return None
+        if len(filter_dict) == 1:
+            return filter_dict
+        return {"$and": [{k: v} for k, v in filter_dict.items()]}
+    
+    def get_by_reference_id(self, reference_id: str, page_size: int = 500,
+                            tenant_id: str = None) -> List[Dict]:
+        """
+        All chunks of a load via metadata lookup - no embedding, no top-k cutoff
+        tenant_id: Restrict to one tenant's chunks
+        """
+        filter_dict = {'reference_id': reference_id, self.router.tenant_key: tenant_id}
+        # Read BEFORE fetching ids: a write racing the fetch leaves the entry stale
+        version = self.versions.get(reference_id)
         
-        results = self.collection.query(
-            query_texts=[query_text],
-            n_results=n_results,
-            where=filter_dict if filter_dict else None
-        )
+        def get_shard(name: str) -> List[Dict]:
+            collection = self._collection(name)
+            with self._ref_lock:
+                cached = self._ref_index.get((name, reference_id))
+            ids = cached[1] if cached and cached[0] == version else None
+            
+            if ids is None:
+                ids = set()
+                offset = 0
+                while True:
+                    page = collection.get(
+                        where={"reference_id": reference_id},
+                        include=[],
+                        limit=page_size,
+                        offset=offset
+                    )
+                    ids.update(page['ids'])
+                    if len(page['ids']) < page_size:
+                        break
+                    offset += page_size
+                with self._ref_lock:
+                    self._ref_index[(name, reference_id)] = (version, ids)
+            
+            ids = sorted(ids)
+            chunks = []
+            for i in range(0, len(ids), page_size):
+                page = collection.get(
+                    ids=ids[i:i + page_size],
+                    include=['documents', 'metadatas']
+                )
+                for j, chunk_id in enumerate(page['ids']):
+                    chunks.append({
+                        'id': chunk_id,
+                        'content': page['documents'][j],
+                        'metadata': page['metadatas'][j]
+                    })
+            return chunks
         
-        # Format results
-        formatted_results = []
-        for i in range(len(results['ids'][0])):
-            formatted_results.append({
-                'content': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i]
+        chunks = [c for shard_chunks in self._fan_out(get_shard, self._shards_for(filter_dict))
+                  for c in shard_chunks]
+        if tenant_id is not None:
+            chunks = [c for c in chunks if c['metadata'].get(self.router.tenant_key) == str(tenant_id)]
+        return chunks
+    
+    def get_headers(self, header_ids: List[str], reference_ids: List[str] = None) -> Dict[str, str]:
+        """
+        Parent header content by header_id (for re-attaching to section chunks)
+        reference_ids: Loads the headers belong to (limits the shards searched)
+        """
+        header_ids = list(dict.fromkeys(h for h in header_ids if h))
+        if not header_ids:
+            return {}
+        
+        if reference_ids:
+            shards = sorted({
+                name for reference_id in set(filter(None, reference_ids))
+                for name in self._reference_shards(reference_id)
             })
+        else:
+            shards = self.shards()
         
-        return formatted_results
+        def get_shard(name: str) -> Dict[str, str]:
+            page = self._collection(name).get(
+                where={"$and": [
+                    {"header_id": {"$in": header_ids}},
+                    {"section_type": "header"}
+                ]},
+                include=['documents', 'metadatas']
+            )
+            return {
+                metadata['header_id']: document
+                for document, metadata in zip(page['documents'], page['metadatas'])
+            }
+        
+        headers = {}
+        for shard_headers in self._fan_out(get_shard, shards):
+            headers.update(shard_headers)
+        return headers
+    
+    def hybrid_query(self,
+                     query_text: str,
+                     n_results: int = 5,
+                     filter_dict: Dict = None,
+                     query_embedding: List[float] = None,
+                     rrf_k: int = 60) -> List[Dict]:
+        """
+        BM25 + vector retrieval fused with reciprocal rank fusion
+        
+        Each result keeps its vector 'distance' (computed for lexical-only
+        hits too) so confidence scoring works unchanged; 'score' is the
+        fused RRF score results are ordered by.
+        """
+        if self.lexical_index is None:
+            return self.query(query_text, n_results, filter_dict, query_embedding)
+        
+        if query_embedding is None:
+            query_embedding = self.embed(query_text)
+        
+        vector_results = self.query(query_text, n_results, filter_dict, query_embedding)
+        lexical_results = self.lexical_index.search(query_text, n_results, filter_dict)
+        
+        scores = {}
+        for rank, r in enumerate(vector_results):
+            scores[r['id']] = scores.get(r['id'], 0.0) + 1 / (rrf_k + rank + 1)
+        for rank, (doc_id, _) in enumerate(lexical_results):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1 / (rrf_k + rank + 1)
+        
+        by_id = {r['id']: r for r in vector_results}
+        
+        # Lexical-only hits: fetch and score against the query vector
+        missing = [doc_id for doc_id, _ in lexical_results if doc_id not in by_id]
+        if missing:
+            def fetch_shard(name: str) -> List[Dict]:
+                collection = self._collection(name)
+                fetched = collection.get(
+                    ids=missing,
+                    include=['documents', 'metadatas', 'embeddings']
+                )
+                return [
+                    {
+                        'id': doc_id,
+                        'content': fetched['documents'][i],
+                        'metadata': fetched['metadatas'][i],
+                        'distance': self._distance(
+                            query_embedding, fetched['embeddings'][i], collection
+                        )
+                    }
+                    for i, doc_id in enumerate(fetched['ids'])
+                ]
+            
+            for shard_results in self._fan_out(fetch_shard, self._shards_for(filter_dict)):
+                by_id.update((r['id'], r) for r in shard_results)
+        
+        ranked = sorted(
+            (doc_id for doc_id in scores if doc_id in by_id),
+            key=lambda doc_id: scores[doc_id],
+            reverse=True
+        )
+        return [
+            {**by_id[doc_id], 'score': round(scores[doc_id], 5)}
+            for doc_id in ranked[:n_results]
+        ]
+    
+    @staticmethod
+    def _distance(a: List[float], b: List[float], collection: Collection) -> float:
+        """Distance in the collection's space (matches Chroma's query distances)"""
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        if space == "cosine":
+            return float(1 - a.dot(b) / (np.linalg.norm(a) * np.linalg.norm(b) or 1.0))
+        if space == "ip":
+            return float(1 - a.dot(b))
+        return float(np.sum((a - b) ** 2))  # Chroma's l2 is squared L2
+    
+    def rebuild_lexical_index(self, page_size: int = 1000) -> int:
+        """Re-index every stored chunk (all shards) into the BM25 index"""
+        self.lexical_index.clear()
+        total = 0
+        for name in self.shards():
+            collection = self._collection(name)
+            offset = 0
+            while True:
+                page = collection.get(
+                    include=['documents', 'metadatas'],
+                    limit=page_size,
+                    offset=offset
+                )
+                if not page['ids']:
+                    break
+                self.lexical_index.add(page['ids'], page['documents'], page['metadatas'])
+                offset += len(page['ids'])
+            total += offset
+        print(f"🔤 Rebuilt BM25 index: {total} chunks")
+        return total
     
     def clear_collection(self):
-        """Clear all data"""
-        self.client.delete_collection("logistics_docs")
-        self.collection = self.client.create_collection("logistics_docs")
\ No newline at end of file
+        """Clear all data (every shard)"""
+        with self._collections_lock:
+            for name in self._shard_names:
+                self.client.delete_collection(name)
+            self._collections.clear()
+            self._shard_names.clear()
+        if self.router.strategy == "none":
+            self._collection(self.router.base_name)
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
+        with self._ref_lock:
+            self._ref_index.clear()
+            self._ref_shards.clear()
+        self.versions.bump(epoch=True)
@@ -0,0 +1,26 @@
+"""
+Shared fixtures: offline stores built on the benchmark fakes
+"""
+import os
+
+import pytest
+
+from benchmarks.fakes import HashEmbeddingFunction
+from src.lexical_index import BM25Index
+from src.shard_router import ShardRouter
+from src.vector_store import VectorStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """VectorStore factory (hash embeddings, temp Chroma + BM25; same strategy = same data)"""
+    def make(strategy: str = "none") -> VectorStore:
+        directory = tmp_path / strategy
+        directory.mkdir(exist_ok=True)
+        return VectorStore(
+            persist_directory=str(directory / "chroma"),
+            embedding_function=HashEmbeddingFunction(),
+            lexical_index=BM25Index(os.path.join(directory, "bm25.db")),
+            router=ShardRouter(strategy=strategy)
+        )
+    return make
@@ -0,0 +1,33 @@
+from src.answer_cache import AnswerCache
+
+from tests.test_vector_store import document
+
+
+def test_entries_go_stale_when_another_process_ingests(make_store, tmp_path):
+    api_store = make_store("none")
+    # ingest.py opens its own VectorStore on the same directory
+    cli_store = type(api_store)(
+        persist_directory=str(tmp_path / "none" / "chroma"),
+        embedding_function=api_store.embedding_function
+    )
+    cache = AnswerCache()
+    embedding = api_store.embed("What is the weight?")
+
+    api_store.add_chunks(document("LD1", "bol", ["weight 100"]))
+    cache.set("LD1", {}, "What is the weight?", embedding, api_store.corpus_version("LD1"), {'answer': "100"})
+    assert cache.get("LD1", {}, "What is the weight?", embedding, api_store.corpus_version("LD1"))
+
+    cli_store.add_chunks(document("LD1", "bol", ["weight 200"]), replace=True)
+
+    assert cache.get("LD1", {}, "What is the weight?", embedding, api_store.corpus_version("LD1")) is None
+
+
+def test_other_loads_keep_their_entries(make_store):
+    store = make_store("none")
+    store.add_chunks(document("LD1", "bol", ["weight 100"]))
+    version, corpus = store.corpus_version("LD1"), store.corpus_version()
+
+    store.add_chunks(document("LD2", "bol", ["weight 300"]))
+
+    assert store.corpus_version("LD1") == version
+    assert store.corpus_version() != corpus
@@ -0,0 +1,78 @@
+import pytest
+
+from src.field_answers import FIELD_ANSWER_CONFIDENCE, answer_from_record, classify_question
+from src.load_records import LoadRecords
+
+RECORD = {
+    'by_doc_type': {
+        'carrier_rc': {'rate': 2400.0, 'currency': 'USD', 'carrier_name': 'Blue Ridge Freight',
+                       'weight': 12000, 'pickup_datetime': '2026-07-18'},
+        'shipper_rc': {'rate': 2750.0, 'currency': 'USD'},
+        'bol': {'consignee': 'Umbrella Beverages', 'weight': 12000},
+    },
+    'merged': {
+        'rate': 2750.0, 'currency': 'USD', 'carrier_name': 'Blue Ridge Freight',
+        'consignee': 'Umbrella Beverages', 'weight': 12000, 'pickup_datetime': '2026-07-18',
+        'delivery_datetime': None,
+        '_metadata': {'sources': ['carrier_rc', 'shipper_rc', 'bol'], 'margin': 350.0}
+    }
+}
+
+
+@pytest.mark.parametrize("question, field, doc_types", [
+    ("What is the carrier rate?", 'rate', ('carrier_rc', )),
+    ("How much is the carrier pay?", 'rate', ('carrier_rc', )),
+    ("What is the customer rate?", 'rate', ('shipper_rc', )),
+    ("What is the rate?", 'rate', ('shipper_rc', 'carrier_rc')),
+    ("What's the margin?", 'margin', None),
+    ("What is the total weight?", 'weight', None),
+    ("Who is the carrier?", 'carrier_name', None),
+    ("Who is the consignee?", 'consignee', None),
+    ("When is pickup?", 'pickup_datetime', None),
+    ("Pick up time?", 'pickup_datetime', None),
+    ("What is the delivery date?", 'delivery_datetime', None),
+])
+def test_single_field_questions(question, field, doc_types):
+    assert classify_question(question)[:2] == (field, doc_types)
+
+
+@pytest.mark.parametrize("question", [
+    "What is the delivery address?",         # delivery, but not the date
+    "What is the carrier's MC number?",      # carrier, but not the name
+    "Is the rate the same across documents?",
+    "Does the carrier rate match the customer rate?",
+    "What is the carrier rate and weight?",
+    "Compare the rates",
+    "Why is the margin so low?",
+    "What commodity is being shipped?",
+    "hello",
+])
+def test_other_questions_go_to_the_llm(question):
+    assert classify_question(question) is None
+
+
+def test_answers_cite_the_doc_type_they_come_from():
+    result = answer_from_record("What is the carrier rate?", RECORD)
+    assert result['answer'] == "The carrier rate (carrier pay) is $2,400.00 [Source 1]."
+    assert result['confidence'] == FIELD_ANSWER_CONFIDENCE
+    assert [s['doc_type'] for s in result['sources']] == ['carrier_rc']
+
+    both = answer_from_record("What is the rate?", RECORD)
+    assert "$2,750.00 [Source 1]" in both['answer'] and "$2,400.00 [Source 2]" in both['answer']
+
+
+def test_missing_fields_fall_through():
+    assert answer_from_record("When is delivery?", RECORD) is None
+    assert answer_from_record("What is the customer rate?", {'by_doc_type': {}, 'merged': {}}) is None
+
+
+def test_records_go_stale_when_the_load_is_ingested_again(tmp_path):
+    path = str(tmp_path / "records.db")
+    records = LoadRecords(path)
+    records.put("LD1", RECORD, records.generation("LD1"))
+    assert records.get("LD1")['merged']['rate'] == 2750.0
+    assert records.get("LD1", tenant_id="acme") is None
+
+    LoadRecords(path).invalidate(["LD1"])  # e.g. ingest.py in another process
+
+    assert records.get("LD1") is None
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.guardrails import (
+    Calibration, _precision_threshold, calculate_confidence, calculate_confidence_batch,
+    check_retrieval_quality, score_answer_quality_batch
+)
+
+
+def test_answer_quality_heuristic():
+    scores = score_answer_quality_batch([
+        "The rate is $1,000 [Source 1]",
+        "Not found in the provided sources.",
+        "Yes",
+    ])
+    assert scores == pytest.approx([1.0, 0.3, 0.63])
+
+
+def test_scalar_confidence_matches_batch():
+    results = [{'distance': d} for d in (0.4, 0.9, 1.3, 2.0)]
+    answer = "The carrier pay is $2,400.00 [Source 2]"
+    batch = calculate_confidence_batch([[0.4, 0.9, 1.3]], [answer])
+    assert calculate_confidence("rate?", results, answer) == round(float(batch[0]), 2)
+    assert calculate_confidence("rate?", [], answer) == 0.0
+
+
+def test_retrieval_quality_check():
+    assert check_retrieval_quality([{'distance': 0.5}], threshold=0.85)
+    assert not check_retrieval_quality([{'distance': 0.9}], threshold=0.85)
+    assert not check_retrieval_quality([], threshold=0.85)
+
+
+def test_precision_threshold_picks_lowest_score_meeting_precision():
+    scores = np.array([0.9, 0.8, 0.7, 0.6, 0.5])
+    labels = np.array([1, 1, 0, 1, 0])
+    # Top 2: 100%, top 4: 75%, top 5: 60%
+    assert _precision_threshold(scores, labels, 0.75, default=0.0) == 0.6
+    assert _precision_threshold(scores, labels, 0.9, default=0.0) == 0.8
+    assert _precision_threshold(scores, labels, 0.6, default=0.0) == 0.5
+
+
+def test_precision_threshold_never_splits_ties():
+    scores = np.array([0.9, 0.7, 0.7, 0.7])
+    labels = np.array([1, 1, 0, 0])
+    # Accepting 0.7 accepts all three tied answers (50%), not just the correct one
+    assert _precision_threshold(scores, labels, 0.6, default=0.0) == 0.9
+
+
+def test_precision_threshold_falls_back_to_default():
+    assert _precision_threshold(np.array([0.9, 0.8]), np.array([0, 0]), 0.5, default=0.4) == 0.4
+
+
+def test_calibration_fit_is_monotonic_and_orders_thresholds(tmp_path):
+    rng = np.random.default_rng(0)
+    scores = rng.uniform(0.3, 1.0, 400)
+    labels = (rng.uniform(0, 1, 400) < scores ** 3).astype(float)
+
+    calibration = Calibration.fit(scores, labels, low_precision=0.5, verify_precision=0.8)
+
+    assert calibration.slope > 0
+    probabilities = calibration.apply(np.linspace(0.3, 1.0, 8))
+    assert np.all(np.diff(probabilities) > 0)
+    assert calibration.low <= calibration.verify
+    accepted = calibration.apply(scores) >= calibration.verify
+    assert labels[accepted].mean() >= 0.8
+
+    path = tmp_path / "calibration.json"
+    calibration.save(str(path))
+    assert Calibration.load(str(path)).to_dict() == calibration.to_dict()
+
+
+def test_calibration_needs_both_labels():
+    with pytest.raises(ValueError):
+        Calibration.fit([0.5, 0.9], [1, 1])
@@ -0,0 +1,102 @@
+import asyncio
+
+from src.job_queue import IngestionQueue, JobStore
+
+
+async def wait_for_status(store: JobStore, job_id: str, status: str, timeout: float = 5.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        job = store.get(job_id)
+        if job['status'] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {store.get(job_id)['status']}")
+
+
+def test_job_runs_and_records_stages(tmp_path):
+    async def handler(job, stage):
+        async with stage("parse"):
+            pass
+        async with stage("store"):
+            pass
+        return {'chunks': 3, 'file': job['filename']}
+
+    async def main():
+        store = JobStore(str(tmp_path / "jobs.db"))
+        queue = IngestionQueue(store, handler, workers=1)
+        await queue.start()
+        job = queue.submit("a.pdf", "/tmp/a.pdf", "hash-a", {'replace': False})
+        done = await wait_for_status(store, job['id'], 'succeeded')
+        await queue.stop()
+        return done
+
+    done = asyncio.run(main())
+    assert done['result'] == {'chunks': 3, 'file': "a.pdf"}
+    assert [s['stage'] for s in done['stages']] == ["parse", "store"]
+
+
+def test_duplicate_upload_joins_the_in_flight_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+
+    async def main():
+        queue = IngestionQueue(store, handler=None, workers=0)  # nothing runs
+        first = queue.submit("a.pdf", "/tmp/a1.pdf", "hash-a", {'replace': False})
+        retry = queue.submit("a.pdf", "/tmp/a2.pdf", "hash-a", {'replace': False})
+        other_options = queue.submit("a.pdf", "/tmp/a3.pdf", "hash-a", {'replace': True})
+        return first, retry, other_options, queue.depth()
+
+    first, retry, other_options, depth = asyncio.run(main())
+    assert retry['id'] == first['id']
+    assert retry['file_path'] == "/tmp/a1.pdf"
+    assert other_options['id'] != first['id']
+    assert depth == 2
+
+
+def test_failed_job_records_error(tmp_path):
+    async def handler(job, stage):
+        async with stage("parse"):
+            raise ValueError("bad pdf")
+
+    async def main():
+        store = JobStore(str(tmp_path / "jobs.db"))
+        queue = IngestionQueue(store, handler, workers=1)
+        await queue.start()
+        job = queue.submit("bad.pdf", "/tmp/bad.pdf", "hash-bad")
+        failed = await wait_for_status(store, job['id'], 'failed')
+        await queue.stop()
+        return failed
+
+    failed = asyncio.run(main())
+    assert failed['error'] == "ValueError: bad pdf"
+    assert failed['stage'] == "parse"
+
+
+def test_unfinished_jobs_resume_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    ran = []
+
+    async def handler(job, stage):
+        ran.append(job['filename'])
+        return {}
+
+    async def before_restart():
+        # Process dies with one job running and one queued
+        store = JobStore(path)
+        queue = IngestionQueue(store, handler, workers=0)
+        running = queue.submit("running.pdf", "/tmp/r.pdf", "hash-r")
+        queue.submit("queued.pdf", "/tmp/q.pdf", "hash-q")
+        store.update(running['id'], status='running', stage='parse')
+
+    async def after_restart():
+        store = JobStore(path)
+        queue = IngestionQueue(store, handler, workers=1)
+        await queue.start()
+        jobs = store.unfinished()
+        for job in jobs:
+            await wait_for_status(store, job['id'], 'succeeded')
+        await queue.stop()
+        return store.unfinished()
+
+    asyncio.run(before_restart())
+    assert asyncio.run(after_restart()) == []
+    assert sorted(ran) == ["queued.pdf", "running.pdf"]
@@ -0,0 +1,57 @@
+import json
+import sqlite3
+
+from src.lexical_index import BM25Index
+
+
+def meta(reference_id: str, tenant_id: str = None) -> dict:
+    metadata = {'reference_id': reference_id, 'doc_type': 'bol'}
+    if tenant_id:
+        metadata['tenant_id'] = tenant_id
+    return metadata
+
+
+def test_corpus_stats_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / "bm25.db")
+    api, ingest = BM25Index(path), BM25Index(path)
+    api.add(["a"], ["scac abcd weight 100"], [meta("LD1")])
+
+    ingest.add(["b", "c"], ["scac wxyz", "weight 200"], [meta("LD2"), meta("LD3")])
+    ingest.delete(["c"])
+
+    assert len(api) == len(ingest) == 2
+    assert api.search("scac abcd") == ingest.search("scac abcd")
+
+
+def test_filters_narrow_results_not_scores(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.db"))
+    index.add(
+        ["a1", "g1", "a2"],
+        ["line haul 1000.00", "line haul 1000.00", "fuel 120"],
+        [meta("LD1", "acme"), meta("LD1", "globex"), meta("LD2", "acme")]
+    )
+
+    everyone = dict(index.search("line haul"))
+    acme = index.search("line haul", filter_dict={'reference_id': 'LD1', 'tenant_id': 'acme'})
+    assert acme == [("a1", everyone["a1"])]
+    assert [d for d, _ in index.search("fuel", filter_dict={'tenant_id': 'acme'})] == ["a2"]
+    assert index.search("fuel", filter_dict={'tenant_id': 'globex'}) == []
+
+
+def test_index_from_before_tenant_column_is_migrated(tmp_path):
+    path = str(tmp_path / "bm25.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE docs (id TEXT PRIMARY KEY, reference_id TEXT, doc_type TEXT, "
+                 "length INTEGER, metadata TEXT)")
+    conn.execute("CREATE TABLE postings (term TEXT, doc_id TEXT, tf INTEGER, "
+                 "PRIMARY KEY (term, doc_id))")
+    conn.execute("INSERT INTO docs VALUES ('a1', 'LD1', 'bol', 1, ?)",
+                 (json.dumps(meta("LD1", "acme")), ))
+    conn.execute("INSERT INTO postings VALUES ('abcd', 'a1', 1)")
+    conn.commit()
+    conn.close()
+
+    index = BM25Index(path)
+
+    assert len(index) == 1
+    assert [d for d, _ in index.search("abcd", filter_dict={'tenant_id': 'acme'})] == ["a1"]
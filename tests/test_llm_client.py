@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import httpx
+
+from src.llm_client import OpenAIClientFactory
+
+
+class SSEBody(httpx.AsyncByteStream):
+    """Endless completion chunks; records whether the response was closed"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def __aiter__(self):
+        chunk = {
+            'id': 'c1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4',
+            'choices': [{'index': 0, 'delta': {'content': 'ok '}, 'finish_reason': None}]
+        }
+        while True:
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+            await asyncio.sleep(0)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_abandoned_stream_closes_response_and_frees_slot():
+    body = SSEBody()
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, headers={'content-type': 'text/event-stream'}, stream=body)
+    )
+    factory = OpenAIClientFactory(
+        api_key="test", base_url="http://llm.test/v1", max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport)
+    )
+
+    async def run():
+        client = factory.client(name="ask")
+        stream = await client.chat.completions.create(
+            model="gpt-4", messages=[{'role': 'user', 'content': 'hi'}], stream=True
+        )
+        async for _ in stream:
+            break  # Client went away after the first token
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert body.closed
+    assert factory.stats()['in_flight'] == 0
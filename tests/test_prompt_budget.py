@@ -0,0 +1,31 @@
+from src.prompt_budget import PromptBudget
+
+HEADER = "BILL OF LADING\nReference: LD1\nShipper: Acme"
+
+
+def test_only_repeated_headers_are_dropped():
+    texts = [
+        f"{HEADER}\n\nLine Haul: $1,000.00",
+        f"{HEADER}\n\nLine Haul: $1,000.00\n\nFuel Surcharge: $120.00",
+        "Line Haul: $1,000.00",
+    ]
+
+    kept, report = PromptBudget(max_tokens=10_000).fit(texts, headers=[HEADER, HEADER, None])
+
+    assert kept == [
+        texts[0],
+        "Line Haul: $1,000.00\n\nFuel Surcharge: $120.00",
+        "Line Haul: $1,000.00",
+    ]
+    assert report['repeated_headers'] == 1
+
+
+def test_header_of_a_dropped_text_is_kept_later():
+    texts = [f"{HEADER}\n\n" + "Accessorial: $10.00\n" * 500, f"{HEADER}\n\nRate: $900.00"]
+
+    kept, report = PromptBudget(max_tokens=200, min_chunk_tokens=10_000).fit(
+        texts, headers=[HEADER, HEADER]
+    )
+
+    assert kept == ["", texts[1]]
+    assert report['dropped'] == 1 and report['repeated_headers'] == 0
@@ -0,0 +1,66 @@
+import asyncio
+
+from benchmarks.fakes import FakeOpenAI
+from src.guardrails import LOW_CONFIDENCE
+from src.rag_engine import RAGEngine
+from src.retrieval_gate import RetrievalGate, matched_keywords, question_keywords
+
+from tests.test_vector_store import document
+
+
+def chunk(content: str, distance: float) -> dict:
+    return {'content': content, 'distance': distance, 'metadata': {}}
+
+
+def test_keywords_match_whole_words_only():
+    keywords = question_keywords("What is the rate?")
+    assert matched_keywords(keywords, "Shipped in a separate trailer") == set()
+    assert matched_keywords(keywords, "Total rate: $1,000") == {'rate'}
+    assert matched_keywords(keywords, "Accessorial rates apply") == {'rate'}
+
+
+def test_strong_retrieval_passes():
+    gate = RetrievalGate()
+    decision = gate.evaluate("What is the weight?", [chunk("Weight: 12,000 lbs", 0.4)] * 3)
+    assert decision['decision'] == 'pass'
+    assert decision['reason'] == 'distance'
+
+
+def test_best_distance_is_found_anywhere_in_hybrid_order():
+    gate = RetrievalGate(max_distance=0.85)
+    # RRF put a lexical hit with a poor vector distance first
+    results = [chunk("Shipper notes", 1.3), chunk("Weight: 12,000 lbs", 0.3), chunk("BOL", 0.5)]
+    assert gate.evaluate("What is the weight?", results)['reason'] == 'distance'
+
+
+def test_substring_hits_do_not_count_as_coverage():
+    gate = RetrievalGate(extractive=False)
+    results = [chunk("Delivered separately, consignee signed", 1.6)] * 3
+    assert gate.evaluate("What is the rate?", results)['decision'] == 'reject'
+
+
+def test_weak_retrieval_with_partial_coverage_is_extractive():
+    gate = RetrievalGate()
+    results = [chunk("Notes\nFuel surcharge: $120.00", 1.6)] * 3
+    decision = gate.evaluate("What fuel surcharge was billed to the consignee account?", results)
+    assert decision['decision'] == 'extractive'
+    assert decision['answer'].startswith("Closest match in the documents: Fuel surcharge: $120.00")
+
+
+class ExtractiveGate(RetrievalGate):
+    def evaluate(self, question, results):
+        return {'decision': 'extractive', 'reason': 'weak_retrieval', 'coverage': 0.3,
+                'answer': "Closest match in the documents: Rate: $1,000.00 [Source 1]"}
+
+
+def test_extractive_answers_are_flagged_low_confidence(make_store):
+    store = make_store("none")
+    store.add_chunks(document("LD1", "carrier_rc", ["Rate: $1,000.00", "Carrier: Acme"]))
+    llm = FakeOpenAI()
+    engine = RAGEngine(api_key="x", vector_store=store, client=llm, gate=ExtractiveGate())
+
+    result = asyncio.run(engine.ask("What is the rate?", "LD1"))
+
+    assert result['confidence'] < LOW_CONFIDENCE
+    assert result['answer'].startswith("⚠️ LOW CONFIDENCE")
+    assert llm.calls == 0
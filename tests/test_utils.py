@@ -0,0 +1,33 @@
+import pytest
+
+from benchmarks.scan import padded_document, per_field, single_pass
+from benchmarks.synthetic import DOC_TYPES
+from src.utils import scan_document
+
+EDGE_CASES = [
+    "",
+    "no sections, no ids",
+    "# Rate Confirmation\n**Reference ID:** LD53657\n## Rate\nCarrier Pay: $1,000",
+    "# BILL OF LADING\nLoad # LD00042\n##\tShipper\nACME\n##NoSpace\n## Consignee",
+    "Pickup Date: 02/08/2026\nXLD12345 is not an id but LD99999 is\n## Pickup\n02/09/2026",
+    "# Frachtbrief – Übersicht\nReference ID: LD7\n## Lieferung\nGewicht: 1.000 kg",
+]
+
+
+@pytest.mark.parametrize("labelled", [True, False])
+@pytest.mark.parametrize("doc_type", DOC_TYPES)
+def test_scan_matches_per_field_functions(doc_type, labelled):
+    for load in range(10):
+        text = padded_document(load, doc_type, pad_kb=2, seed=load, labelled=labelled)
+        assert single_pass(text) == per_field(text)
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_scan_matches_per_field_on_edge_cases(text):
+    assert single_pass(text) == per_field(text)
+
+
+def test_section_types_start_with_header():
+    result = scan_document("# Header\nx\n## Rate Breakdown\n$1\n## Stops\nPickup")
+    assert result['section_types'][0] == 'header'
+    assert len(result['section_types']) == 3
@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional
+
+import pytest
+
+
+def document(reference_id: str, doc_type: str, texts: List[str],
+             tenant_id: Optional[str] = None, pickup_date: str = "2026-03-02") -> List[Dict]:
+    chunks = []
+    for i, text in enumerate(texts):
+        metadata = {'reference_id': reference_id, 'doc_type': doc_type,
+                    'chunk_id': i, 'pickup_date': pickup_date}
+        if tenant_id:
+            metadata['tenant_id'] = tenant_id
+        chunks.append({'content': text, 'metadata': metadata})
+    return chunks
+
+
+@pytest.mark.parametrize("strategy", ["none", "month", "tenant"])
+def test_replace_keeps_other_tenants_chunks(make_store, strategy):
+    store = make_store(strategy)
+    store.add_chunks(document("LD1", "bol", ["acme weight 100", "acme shipper"], "acme"))
+    store.add_chunks(document("LD1", "bol", ["globex weight 200", "globex shipper"], "globex"))
+
+    store.add_chunks(document("LD1", "bol", ["globex weight 250"], "globex"), replace=True)
+
+    acme = store.get_by_reference_id("LD1", tenant_id="acme")
+    globex = store.get_by_reference_id("LD1", tenant_id="globex")
+    assert sorted(c['content'] for c in acme) == ["acme shipper", "acme weight 100"]
+    assert [c['content'] for c in globex] == ["globex weight 250"]
+
+
+def test_untenanted_replace_keeps_tenant_chunks(make_store):
+    store = make_store("none")
+    store.add_chunks(document("LD1", "bol", ["acme weight 100"], "acme"))
+    store.add_chunks(document("LD1", "bol", ["old weight 1"]))
+
+    store.add_chunks(document("LD1", "bol", ["new weight 2"]), replace=True)
+
+    contents = sorted(c['content'] for c in store.get_by_reference_id("LD1"))
+    assert contents == ["acme weight 100", "new weight 2"]
+
+
+def test_month_pinning_is_per_tenant(make_store):
+    store = make_store("month")
+    store.add_chunks(document("LD1", "bol", ["acme bol"], "acme", pickup_date="2026-01-05"))
+    store.add_chunks(document("LD1", "bol", ["globex bol"], "globex", pickup_date="2026-04-05"))
+    # A later acme document follows acme's first one, whatever its own date
+    store.add_chunks(document("LD1", "carrier_rc", ["acme rc"], "acme", pickup_date="2026-04-05"))
+
+    assert store._reference_shards("LD1", "acme") == ["logistics_docs-m-2026-01"]
+    assert store._reference_shards("LD1", "globex") == ["logistics_docs-m-2026-04"]
+    assert sorted(store._reference_shards("LD1")) == [
+        "logistics_docs-m-2026-01", "logistics_docs-m-2026-04"
+    ]
+
+
+def test_reads_see_chunks_stored_by_another_process(make_store):
+    api, ingest = make_store("none"), make_store("none")
+    api.add_chunks(document("LD1", "carrier_rc", ["rate confirmation"]))
+    assert len(api.get_by_reference_id("LD1")) == 1
+
+    ingest.add_chunks(document("LD1", "bol", ["bill of lading"]))
+
+    contents = sorted(c['content'] for c in api.get_by_reference_id("LD1"))
+    assert contents == ["bill of lading", "rate confirmation"]
+
+
+@pytest.mark.parametrize("strategy", ["month", "tenant"])
+def test_reads_see_shards_created_by_another_process(make_store, strategy):
+    api, ingest = make_store(strategy), make_store(strategy)
+    assert api.get_by_reference_id("LD1", tenant_id="acme") == []
+
+    ingest.add_chunks(document("LD1", "bol", ["acme bol"], "acme"))
+
+    assert [c['content'] for c in api.get_by_reference_id("LD1", tenant_id="acme")] == ["acme bol"]
+    assert api.shards() == ingest.shards()
@@ -5,9 +5,12 @@ import streamlit as st
 import requests
 import json
 import os
+import time
 
 # API Configuration
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+# Seconds to wait for a queued upload before giving up on polling
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", "600"))
 
 # Page config
 st.set_page_config(
@@ -42,8 +45,26 @@ with st.sidebar:
                 files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/pdf")}
                 response = requests.post(f"{API_URL}/upload", files=files)
                 
-                if response.status_code == 200:
-                    result = response.json()
+                # Upload is queued; poll the job until it finishes
+                if response.status_code == 202:
+                    job_url = f"{API_URL}{response.json()['status_url']}"
+                    deadline = time.monotonic() + UPLOAD_TIMEOUT
+                    while True:
+                        job = requests.get(job_url, timeout=10).json()
+                        # Anything but queued/running is final (incl. a missing job)
+                        if job.get('status') not in ('queued', 'running'):
+                            break
+                        if time.monotonic() > deadline:
+                            job = {'status': 'timeout'}
+                            break
+                        time.sleep(1)
+                
+                if response.status_code == 202 and job.get('status') == 'timeout':
+                    st.warning(f"⏳ Still processing after {UPLOAD_TIMEOUT:.0f}s - check {job_url}")
+                elif response.status_code == 202 and job.get('status') != 'succeeded':
+                    st.error(f"❌ Error: {job.get('error') or job.get('detail') or 'Unknown error'}")
+                elif response.status_code == 202:
+                    result = job['result']
                     st.success(f"✅ Processed successfully!")
                     st.info(f"**Reference ID:** {result.get('reference_id', 'N/A')}")
                     st.info(f"**Document Type:** {result.get('doc_type', 'N/A')}")
@@ -136,14 +157,31 @@ with tab1:
                     "question": question,
                     "reference_id": reference_id_input if reference_id_input else None
                 }
-                response = requests.post(f"{API_URL}/ask", data=data)
+                response = requests.post(f"{API_URL}/ask/stream", data=data, stream=True)
                 
                 if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Display answer
+                    # Display answer as tokens arrive (server-sent events)
                     st.markdown("### 📝 Answer")
-                    st.write(result['answer'])
+                    answer_box = st.empty()
+                    streamed = ""
+                    result = None
+                    event = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line.startswith("event: "):
+                            event = line[len("event: "):]
+                        elif line.startswith("data: "):
+                            payload = json.loads(line[len("data: "):])
+                            if event == 'token':
+                                streamed += payload
+                                answer_box.markdown(streamed + "▌")
+                            elif event == 'done':
+                                result = payload
+                            elif event == 'error':
+                                raise RuntimeError(payload.get('detail', 'Unknown error'))
+                    
+                    if result is None:
+                        raise RuntimeError("Stream ended before the answer completed")
+                    answer_box.write(result['answer'])
                     
                     # Display confidence
                     conf = result['confidence']